@@ -11,6 +11,9 @@ Custom collate functions should be passed to the ``collate_fn`` argument of a
 
 * `packed_sequence() <torchtime.collate.packed_sequence>`_ returns ``X`` and ``y`` as a
   ``PackedSequence`` object
+
+* `trim_to_length() <torchtime.collate.trim_to_length>`_ removes padding beyond the
+  longest sequence in each batch
 """
 
 from typing import Dict, Union
@@ -127,3 +130,28 @@ def packed_sequence(
     X = pack_padded_sequence(batch_data["X"], length, batch_first=True)
     y = pack_padded_sequence(batch_data["y"], length, batch_first=True)
     return {"X": X, "y": y, "length": length}
+
+
+def trim_to_length(batch_data: Dict[str, Tensor]) -> Dict[str, Tensor]:
+    """**Collates a batch and removes padding beyond the longest sequence.**
+
+    Pass to the ``collate_fn`` argument when creating a PyTorch DataLoader. Batches are
+    a named dictionary with ``X``, ``y`` and ``length`` data where ``X`` (and ``y`` if
+    there is a label at each time point) are trimmed to the length of the longest
+    sequence in the batch. Use with `BucketBatchSampler
+    <torchtime.data.BucketBatchSampler>`_ to batch sequences of similar length.
+
+    Args:
+        batch_data: Batch from a ``torchtime.data`` class.
+
+    Returns:
+        Updated batch.
+    """
+    X = torch.stack([i["X"] for i in batch_data], dim=0)
+    y = torch.stack([i["y"] for i in batch_data])
+    length = torch.stack([i["length"] for i in batch_data])
+    max_length = length.max()
+    X = X[:, :max_length]
+    if y.dim() == 3:
+        y = y[:, :max_length]
+    return {"X": X, "y": y, "length": length}
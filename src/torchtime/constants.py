@@ -3,10 +3,13 @@ from typing import Final
 import numpy as np
 
 # Constants
+CACHE_MANIFEST: Final[str] = "channels.json"
 CHECKSUM_EXT: Final[str] = ".sha256"
 DATASET_OBJS: Final[list] = ["X", "y", "length"]
 EPS: Final[float] = np.finfo(float).eps
 OBJ_EXT: Final[str] = ".pt"
+PREFETCH_THREADS: Final[int] = 4
+STRATIFY_OBJ: Final[str] = "stratify"
 TQDM_FORMAT: Final[
     str
 ] = "{percentage:3.0f}%|{bar}| {n_fmt}/{total_fmt} [{elapsed}<{remaining}]"
@@ -72,6 +75,7 @@ PHYSIONET_2012_VARS: Final[list] = [
     "ICUType3",
     "ICUType4",
 ]
+PHYSIONET_2012_ICU_ONEHOT: Final[np.ndarray] = np.eye(4)  # one-hot encoded ICUType
 
 # PhysioNet 2019
 PHYSIONET_2019_DATASETS: Final[dict] = {
@@ -7,47 +7,143 @@ Time series data sets
 * `PhysioNet2019 <#torchtime.data.PhysioNet2019>`_
 * `PhysioNet2019Binary <#torchtime.data.PhysioNet2019Binary>`_
 * `UEA <#torchtime.data.UEA>`_
+
+Data sets can be iterated over in batches using
+`BatchedDataset <#torchtime.data.BatchedDataset>`_. Samples of similar length can be
+batched together using `BucketBatchSampler <#torchtime.data.BucketBatchSampler>`_.
 """
 
-import csv
 import pathlib
-from typing import Callable, Dict, List, Union
+from typing import Callable, Dict, List, Tuple, Union
 
 import numpy as np
 import pandas as pd
 import torch
-import torch.nn.functional as F
 from sklearn.model_selection import train_test_split
 from sktime.datasets import load_from_tsfile_to_dataframe
 from torch import Tensor
-from torch.nn.utils.rnn import pad_sequence
-from torch.utils.data import Dataset
-from tqdm import tqdm
+from torch.utils.data import Dataset, IterableDataset, Sampler, get_worker_info
 
 from torchtime.constants import (
     EPS,
-    OBJ_EXT,
     PHYSIONET_2012_DATASETS,
+    PHYSIONET_2012_ICU_ONEHOT,
     PHYSIONET_2012_OUTCOMES,
     PHYSIONET_2012_VARS,
     PHYSIONET_2019_DATASETS,
-    TQDM_FORMAT,
+    STRATIFY_OBJ,
     UEA_DOWNLOAD_URL,
 )
 from torchtime.impute import forward_impute, replace_missing
 from torchtime.utils import (
+    _cache_channels,
     _cache_data,
     _cache_exists,
+    _channels_cache_name,
+    _clear_cache,
+    _clear_channels_cache,
     _download_archive,
     _download_to_directory,
+    _generator,
     _get_file_list,
+    _get_file_names,
+    _load_cache,
     _nanmode,
+    _parallel_parse,
     _physionet_download,
     _simulate_missing,
     _validate_cache,
 )
 
 
+def _split_attribute(obj, split):
+    """Attribute returning ``obj`` (``X``, ``y`` or ``length``) for a data split. The
+    attribute can be assigned to, as when it was a plain instance attribute."""
+    name = "{}_{}".format(obj, split)
+    i = ["X", "y", "length"].index(obj)
+
+    def getter(self):
+        if split not in self._splits:
+            raise AttributeError(
+                "'{}' object has no attribute '{}'".format(type(self).__name__, name)
+            )
+        return self._get_split(split)[i]
+
+    def setter(self, value):
+        if split not in self._splits:
+            self._splits[split] = [None] * 3
+            self._transformed.add(split)
+        self._get_split(split)[i] = value  # transform first so value is kept as is
+
+    return property(getter, setter)
+
+
+def _get_physionet_2019_length(file_path):
+    """Get the length of a PhysioNet 2019 time series and the number of channels in the
+    header of the ``.psv`` file. Rows are counted without parsing the file."""
+    with open(file_path, "rb") as file:
+        data = file.read()
+    channels = data[: data.find(b"\n")].count(b"|") + 1
+    length = data.count(b"\n") + (not data.endswith(b"\n")) - 1  # ignore header
+    return length, channels
+
+
+def _process_physionet_2019_file(file_path, channels):
+    """Process a PhysioNet 2019 ``.psv`` file. Returns arrays of shape (*s*, *c* - 1)
+    and (*s*, 1)."""
+    rows = np.loadtxt(file_path, delimiter="|", skiprows=1, ndmin=2)
+    rows = rows.reshape(-1, channels)
+    return rows[:, :-1], rows[:, -1:]
+
+
+def _process_physionet_2019_binary_file(file_path, channels, max_time):
+    """Process a PhysioNet 2019 ``.psv`` file for the binary prediction variant. Returns
+    the indices of observations up to ``max_time``, their values and whether the patient
+    develops sepsis at any point."""
+    X, y = _process_physionet_2019_file(file_path, channels)
+    idx = np.flatnonzero(X[:, 39] <= max_time)
+    return idx, X[idx], y.max(initial=0.0)
+
+
+def _parse_ts_file(file_path):
+    """Parse a UEA ``.ts`` file without time stamps. Returns the channels of each time
+    series as a list of arrays and the labels. Raises a ``ValueError`` if the file has
+    time stamps or no class labels."""
+    X, y = [], []
+    with open(file_path, encoding="utf-8") as file:
+        for line in file:  # header
+            tag = line.strip().lower().split()
+            if tag[:2] == ["@timestamps", "true"]:
+                raise ValueError("time stamps are not supported")
+            if tag[:2] == ["@classlabel", "false"]:
+                raise ValueError("class labels are required")
+            if tag == ["@data"]:
+                break
+        for line in file:  # data
+            line = line.strip()
+            if line and not line.startswith("#"):
+                *channels, label = line.split(":")
+                X.append(
+                    [
+                        np.array(Xij.replace("?", "nan").split(","), dtype=np.float32)
+                        for Xij in channels
+                    ]
+                )
+                y.append(label.strip())
+    return X, np.array(y)
+
+
+def _load_ts_file(file_path):
+    """Load a UEA ``.ts`` file. Returns the channels of each time series as a list of
+    arrays and the labels. Files with time stamps are loaded using ``sktime``."""
+    try:
+        return _parse_ts_file(file_path)
+    except ValueError:
+        X, y = load_from_tsfile_to_dataframe(file_path)
+        X = [[Xij.to_numpy(dtype=np.float32) for Xij in Xi] for Xi in X.to_numpy()]
+        return X, y
+
+
 class _TimeSeriesDataset(Dataset):
     """**Generic time series PyTorch Dataset.**
 
@@ -107,6 +203,18 @@ class _TimeSeriesDataset(Dataset):
             `Che et al (2018) <https://doi.org/10.1038/s41598-018-24271-9>`_. Default
             False.
         standardise: Standardise the time series (default False).
+        dtype: Floating point precision of ``X`` (default ``torch.float32``). Reduced
+            precision, for example ``torch.bfloat16``, halves the memory required. If
+            ``time`` or ``delta`` is True, time stamps must be stored exactly so
+            ``dtype`` is only supported for trajectories of up to 257 time points for
+            ``torch.bfloat16`` (2,049 for ``torch.float16``).
+        pin_memory: Return data in pinned memory for faster transfer to a CUDA device
+            (default False). Use ``.to(device, non_blocking=True)`` in the training loop
+            and do not also set ``pin_memory`` in the DataLoader.
+        share_memory: Move the returned split to shared memory so DataLoader worker
+            processes started with *spawn* do not each copy it (default False). Not
+            required if ``num_workers=0`` or workers are forked. Note shared memory is
+            limited in some environments, for example 64MB by default in Docker.
         overwrite_cache: Overwrite saved cache (default False).
         path: Location of the ``.torchtime`` cache directory (default ".").
         seed: Random seed for reproducibility (optional).
@@ -136,7 +244,8 @@ class _TimeSeriesDataset(Dataset):
         ``X``, ``y`` and ``length`` are available for the training, validation and test
         splits by appending ``_train``, ``_val`` and ``_test`` respectively. For
         example, ``y_val`` returns the labels for the validation data set. These
-        attributes are available regardless of the ``split`` argument.
+        attributes are available regardless of the ``split`` argument. Splits other
+        than ``split`` are standardised/imputed when first accessed.
 
     Returns:
         A PyTorch Dataset object which can be passed to a DataLoader.
@@ -156,6 +265,9 @@ class _TimeSeriesDataset(Dataset):
         mask: bool = False,
         delta: bool = False,
         standardise: bool = False,
+        dtype: torch.dtype = torch.float32,
+        pin_memory: bool = False,
+        share_memory: bool = False,
         overwrite_cache: bool = False,
         path: str = ".",
         seed: int = None,
@@ -173,6 +285,9 @@ class _TimeSeriesDataset(Dataset):
         self.mask = mask
         self.delta = delta
         self.standardise = standardise
+        self.dtype = dtype
+        self.pin_memory = pin_memory
+        self.share_memory = share_memory
         self.overwrite_cache = overwrite_cache
         self.path = pathlib.Path() / path / ".torchtime" / self.dataset
         self.seed = seed
@@ -189,143 +304,98 @@ class _TimeSeriesDataset(Dataset):
         self._validate_arguments()
 
         # 1. Get data from cache or, if no cache, call _get_data() and cache results
-        if _cache_exists(self.path) and not self.overwrite_cache:
-            if _validate_cache(self.path):
-                X_all = torch.load(self.path / ("X" + OBJ_EXT))
-                y_all = torch.load(self.path / ("y" + OBJ_EXT))
-                length_all = torch.load(self.path / ("length" + OBJ_EXT))
-            else:
-                raise Exception(
-                    "Cache is corrupted! Use 'overwrite_cache' = True to rebuild."
-                )
-        else:
-            X_all, y_all, length_all = self._get_data()
-            X_all = X_all.float()  # float32 precision
-            y_all = y_all.float()  # float32 precision
-            length_all = length_all.long()  # int64 precision
-            _cache_data(self.path, X_all, y_all, length_all)
-
-        # 2. Simulate missing data
-        if (type(self.missing) is list and sum(self.missing) > EPS) or (
+        simulate_missing = (type(self.missing) is list and sum(self.missing) > EPS) or (
             type(self.missing) is float and self.missing > EPS
-        ):
-            _simulate_missing(X_all, self.missing, seed=self.seed)
-
-        # 3. Add time stamp/mask/time delta channels
-        if self.time:
-            X_all = torch.cat([self._time_stamp(X_all), X_all], dim=2)
-        if self.mask:
-            X_all = torch.cat([X_all, self._missing_mask(X_all)], dim=2)
-        if delta:
-            X_all = torch.cat([X_all, self._time_delta(X_all)], dim=2)
+        )
+        channels_options = {"time": self.time, "mask": self.mask, "delta": self.delta}
+        if (self.mask or self.delta) and not simulate_missing:
+            channels_obj = _channels_cache_name(channels_options)
+        else:
+            # Cheap to recalculate, or would cache a variant for each missing/seed
+            channels_obj = None
+        X_all, y_all, length_all, channels_cached = self._load_data(channels_obj)
+
+        if not channels_cached:
+            # 2. Simulate missing data
+            if simulate_missing:
+                _simulate_missing(X_all, self.missing, seed=self.seed)
+
+            # 3. Add time stamp/mask/time delta channels
+            X_all = self._add_channels(X_all)
+            if channels_obj is not None:
+                _cache_channels(self.path, channels_obj, X_all, channels_options)
+        # Time stamps/time deltas are integers so must be stored exactly
+        max_exact_int = 2 / torch.finfo(self.dtype).eps
+        assert (
+            not (self.time or self.delta) or X_all.size(1) - 1 <= max_exact_int
+        ), "argument 'dtype' cannot store time stamps up to {} exactly".format(
+            X_all.size(1) - 1
+        )
+        X_all = X_all.to(self.dtype)
 
         # 4. Form train/validation/test splits
-        stratify = torch.nansum(y_all, dim=1) > 0
-        (
-            self.X_train,
-            self.y_train,
-            self.length_train,
-            self.X_val,
-            self.y_val,
-            self.length_val,
-            self.X_test,
-            self.y_test,
-            self.length_test,
-        ) = self._split_data(
-            X_all,
-            y_all,
-            length_all,
-            stratify,
-        )
+        stratify = self._load_stratify(y_all)
+        splits = self._split_data(X_all, y_all, length_all, stratify)
+        self._splits = {"train": list(splits[0:3]), "val": list(splits[3:6])}
+        if self.test_prop > EPS:
+            self._splits["test"] = list(splits[6:9])
+        self._transformed = set()  # splits that have been standardised/imputed
+        X_train = self._splits["train"][0]
 
         # Set up for standardisation/imputation
+        self._data_idx, self._train_shift, self._train_scale, self._fill = [None] * 4
         if self.standardise or self.impute != "none":
             # Number of channels
             n_channels = int(
-                (self.X_train.size(2) - self.time) / (1 + self.mask + self.delta)
+                (X_train.size(2) - self.time) / (1 + self.mask + self.delta)
             )
-            # Time series channels
-            data_idx = torch.arange(self.time, self.time + n_channels)
-            X_train_data = self.X_train[:, :, data_idx]
+            # Time series channels (channel first so reductions are contiguous)
+            self._data_idx = torch.arange(self.time, self.time + n_channels)
+            # Slice rather than index with _data_idx so the reshape is a view
+            X_train_data = X_train[:, :, self.time : (self.time + n_channels)]
+            X_train_data = X_train_data.reshape(-1, n_channels)
+            X_train_data = X_train_data.T.contiguous()  # shape (c, n * s)
             # Training data channel means
-            train_means = torch.nanmean(X_train_data, dim=(0, 1), keepdim=True)
-            fill = train_means.flatten()
-        else:
-            # Null values to pass to imputer()
-            fill = None
-            data_idx = None
+            n_observed = torch.sum(~torch.isnan(X_train_data), dim=1)
+            train_means = torch.nansum(X_train_data.float(), dim=1) / n_observed
 
-        # 5. Standardise data
+        # 5. Training data statistics for standardisation
         if self.standardise:
             # Training data channel standard deviations
-            train_stds = torch.full((1, 1, n_channels), fill_value=float("nan"))
-            for c, Xc in enumerate(X_train_data.unbind(dim=-1)):
-                train_stds[:, :, c] = torch.std(Xc[~torch.isnan(Xc)])
-            # Standardise data
-            self.X_train[:, :, self.time : (self.time + n_channels)] = (
-                self.X_train[:, :, self.time : (self.time + n_channels)] - train_means
-            ) / (train_stds + EPS)
-            self.X_val[:, :, self.time : (self.time + n_channels)] = (
-                self.X_val[:, :, self.time : (self.time + n_channels)] - train_means
-            ) / (train_stds + EPS)
-            if self.test_prop > EPS:
-                self.X_test[:, :, self.time : (self.time + n_channels)] = (
-                    self.X_test[:, :, self.time : (self.time + n_channels)]
-                    - train_means
-                ) / (train_stds + EPS)
+            X_train_double = X_train_data.double()  # avoid rounding error
+            train_sq_diff = (
+                X_train_double
+                - torch.nansum(X_train_double, dim=1, keepdim=True)
+                / n_observed.unsqueeze(1)
+            ) ** 2
+            train_stds = torch.sqrt(
+                torch.nansum(train_sq_diff, dim=1) / (n_observed - 1)
+            )
+            self._train_shift = train_means.reshape(1, 1, n_channels)
+            self._train_scale = train_stds.float().reshape(1, 1, n_channels) + EPS
 
         # Additional set up for imputation
         if self.impute != "none":
-            if self.categorical != []:
-                # Impute using mode if categorical variable
-                assert (
-                    all([type(cat) is int for cat in self.categorical])
-                    and min(self.categorical) >= 0
-                    and max(self.categorical) < n_channels
-                ), "indices in 'categorical' should be between 0 and {}".format(
-                    n_channels - 1
-                )
-                train_modes = [
-                    _nanmode(X_train_data[:, :, channel])
-                    for channel in self.categorical
-                ]
-                for i, idx in enumerate(self.categorical):
-                    fill[idx] = train_modes[i]
-            # Override mean/mode if required
-            if self.channel_means != {}:
-                for x, y in self.channel_means.items():
-                    assert (
-                        type(x) is int and x >= 0 and x < n_channels
-                    ), "keys in 'channel_means' should be between 0 and {}".format(
-                        n_channels - 1
-                    )
-                    fill[x] = y
-
-        # 6. Impute missing data
-        self.X_train, self.y_train = self.imputer(
-            self.X_train, self.y_train, fill, data_idx
-        )
-        self.X_val, self.y_val = self.imputer(self.X_val, self.y_val, fill, data_idx)
-        if self.test_prop > EPS:
-            self.X_test, self.y_test = self.imputer(
-                self.X_test, self.y_test, fill, data_idx
-            )
-        else:
-            del self.X_test, self.y_test, self.length_test
-
-        # 7. Return data split
-        if split == "test":
-            self.X = self.X_test
-            self.y = self.y_test
-            self.length = self.length_test
-        elif split == "train":
-            self.X = self.X_train
-            self.y = self.y_train
-            self.length = self.length_train
-        else:
-            self.X = self.X_val
-            self.y = self.y_val
-            self.length = self.length_val
+            self._fill = self._fill_values(X_train_data, train_means)
+
+        # 6. Return data split (other splits are standardised/imputed on first access)
+        if self.pin_memory:
+            self._splits[split] = [t.pin_memory() for t in self._get_split(split)]
+        elif self.share_memory:
+            # Share with DataLoader worker processes rather than copying to each worker
+            for tensor in self._get_split(split):
+                tensor.share_memory_()
+        self.X, self.y, self.length = self._get_split(split)
+
+    X_train = _split_attribute("X", "train")
+    y_train = _split_attribute("y", "train")
+    length_train = _split_attribute("length", "train")
+    X_val = _split_attribute("X", "val")
+    y_val = _split_attribute("y", "val")
+    length_val = _split_attribute("length", "val")
+    X_test = _split_attribute("X", "test")
+    y_test = _split_attribute("y", "test")
+    length_test = _split_attribute("length", "test")
 
     def __str__(self):
         """Print data set details."""
@@ -369,6 +439,16 @@ class _TimeSeriesDataset(Dataset):
             self.imputer = self.impute
         else:
             raise Exception(impute_error)
+        # Validate precision
+        assert (
+            type(self.dtype) is torch.dtype and self.dtype.is_floating_point
+        ), "argument 'dtype' must be a floating point torch.dtype"
+        assert (
+            not self.pin_memory or torch.cuda.is_available()
+        ), "argument 'pin_memory' requires a CUDA device"
+        assert not (
+            self.pin_memory and self.share_memory
+        ), "arguments 'pin_memory' and 'share_memory' cannot both be True"
         # Validate/set data splits
         assert (
             self.train_prop > EPS and self.train_prop < 1
@@ -417,10 +497,127 @@ class _TimeSeriesDataset(Dataset):
         y_imputed = forward_impute(y)
         return X_imputed, y_imputed
 
+    def transform(self, X: Tensor, y: Tensor) -> Tuple[Tensor, Tensor]:
+        """Standardise and/or impute data using the training data statistics, as
+        applied to the training, validation and test splits. ``X`` must have the same
+        channels as the data set (including any time stamp, mask and time delta
+        channels). ``X`` and ``y`` are not modified.
+
+        Args:
+            X: Time series data of shape (*n*, *s*, *c*).
+            y: Label data of shape (*n*, *l*).
+
+        Returns:
+            Tuple of transformed ``X`` and ``y`` tensors.
+        """
+        return self._transform(X.to(self.dtype, copy=True), y)
+
+    def _transform(self, X, y):
+        """Standardise ``X`` in place and impute ``X`` and ``y``."""
+        if self.standardise:
+            n_channels = self._train_shift.size(-1)
+            X[:, :, self.time : (self.time + n_channels)].sub_(self._train_shift).div_(
+                self._train_scale
+            )
+        return self.imputer(X, y, self._fill, self._data_idx)
+
+    def _get_split(self, split):
+        """Returns ``X``, ``y`` and ``length`` for a data split. The split is
+        standardised/imputed on first access."""
+        if split not in self._transformed:
+            X, y, length = self._splits[split]
+            self._splits[split] = [*self._transform(X, y), length]
+            self._transformed.add(split)
+        return self._splits[split]
+
+    def _fill_values(self, X_train_data, train_means):
+        """Values used to impute missing data given training data of shape (*c*,
+        *n* x *s*) and channel means. Uses the mode for categorical channels unless
+        overridden by ``channel_means``."""
+        n_channels = X_train_data.size(0)
+        fill = train_means.clone()
+        if self.categorical != []:
+            # Impute using mode if categorical variable
+            assert (
+                all([type(cat) is int for cat in self.categorical])
+                and min(self.categorical) >= 0
+                and max(self.categorical) < n_channels
+            ), "indices in 'categorical' should be between 0 and {}".format(
+                n_channels - 1
+            )
+            categorical = torch.tensor(self.categorical, dtype=torch.long)
+            fill[categorical] = _nanmode(X_train_data[categorical].T).float()
+        # Override mean/mode if required
+        for x, y in self.channel_means.items():
+            assert (
+                type(x) is int and x >= 0 and x < n_channels
+            ), "keys in 'channel_means' should be between 0 and {}".format(
+                n_channels - 1
+            )
+            fill[x] = y
+        return fill
+
     def _get_data(self):
         """Overload this function to return ``X``, ``y`` and ``length`` tensors."""
         raise NotImplementedError
 
+    def _load_data(self, channels_obj=None):
+        """Load ``X``, ``y`` and ``length`` tensors from the cache or, if no cache, call
+        ``_get_data()`` and cache the results. If ``channels_obj`` is cached, ``X`` is
+        loaded with missing data simulated and time stamp/mask/time delta channels
+        added. Also returns whether this is the case."""
+        if _cache_exists(self.path) and not self.overwrite_cache:
+            channels_cached = channels_obj is not None and _cache_exists(
+                self.path, [channels_obj]
+            )
+            objs = [channels_obj if channels_cached else "X", "y", "length"]
+            if not _validate_cache(self.path, objs):
+                raise Exception(
+                    "Cache is corrupted! Use 'overwrite_cache' = True to rebuild."
+                )
+            X, y, length = [_load_cache(self.path, obj) for obj in objs]
+        else:
+            channels_cached = False
+            X, y, length = self._get_data()
+            X = X.float()  # float32 precision
+            y = y.float()  # float32 precision
+            length = length.long()  # int64 precision
+            # Remove objects derived from any previous data
+            _clear_channels_cache(self.path)
+            _clear_cache(self.path, [STRATIFY_OBJ])
+            _cache_data(self.path, X, y, length)
+        return X, y, length, channels_cached
+
+    def _load_stratify(self, y):
+        """Load labels used to stratify the data splits from the cache or, if no cache,
+        calculate and cache them."""
+        stratify_cached = _cache_exists(self.path, [STRATIFY_OBJ])
+        if stratify_cached and not self.overwrite_cache:
+            if _validate_cache(self.path, [STRATIFY_OBJ]):
+                return _load_cache(self.path, STRATIFY_OBJ)
+        stratify = torch.nansum(y, dim=1) > 0
+        _cache_data(self.path, stratify, objs=[STRATIFY_OBJ])
+        return stratify
+
+    def _add_channels(self, X):
+        """Add time stamp/mask/time delta channels."""
+        if not (self.time or self.mask or self.delta):
+            return X  # no channels to add
+        n_channels = X.size(-1)
+        n_out = self.time + n_channels * (1 + self.mask + self.delta)
+        X_out = X.new_empty((X.size(0), X.size(1), n_out))
+        if self.time:
+            X_out[:, :, 0] = torch.arange(X.size(1))
+        data_end = self.time + n_channels  # end of time series channels
+        X_out[:, :, self.time : data_end] = X
+        if self.mask:
+            X_out[:, :, data_end : (data_end + n_channels)] = self._missing_mask(
+                X_out[:, :, :data_end]
+            )
+        if self.delta:
+            X_out[:, :, -n_channels:] = self._time_delta(X_out[:, :, :-n_channels])
+        return X_out
+
     @staticmethod
     def _time_stamp(X):
         """Calculate time stamp."""
@@ -430,100 +627,75 @@ class _TimeSeriesDataset(Dataset):
 
     def _missing_mask(self, X):
         """Calculate missing data mask."""
-        mask = torch.logical_not(torch.isnan(X[:, :, self.time :]))
-        return mask
+        return torch.logical_not(torch.isnan(X[:, :, self.time :]))
 
     def _time_delta(self, X):
         """Calculate time delta calculated as in Che et al, 2018, see
         https://www.nature.com/articles/s41598-018-24271-9."""
-        # Add time and mask channels
-        if not self.time:
-            X = torch.cat([self._time_stamp(X), X], dim=2)
-        if not self.mask:
-            X = torch.cat([X, self._missing_mask(X)], dim=2)
-        # Time of each observation by channel
-        n_channels = int((X.size(-1) - 1) / 2)
-        X = X.transpose(1, 2)  # shape (n, c, s)
-        time_stamp = X[:, 0].unsqueeze(1).repeat(1, n_channels, 1)
-        # Time delta/mask are 0/1 at time 0 by definition
-        time_delta = time_stamp.clone()
-        time_delta[:, :, 0] = 0
-        time_mask = X[:, -n_channels:].clone()
-        time_mask[:, :, 0] = 1
-        # Time of previous observation if data missing
-        time_delta = time_delta.gather(-1, torch.cummax(time_mask, -1)[1])
-        # Calculate time delta
+        n_channels = int((X.size(-1) - self.time) / (1 + self.mask))
+        # Time stamp (shape (n, s, 1) and broadcast across channels)
+        if self.time:
+            time_stamp = X[:, :, 0:1]
+        else:
+            time_stamp = self._time_stamp(X).to(X.dtype)
+        # Missing data mask (shape (n, s, c))
+        if self.mask:
+            time_mask = X[:, :, -n_channels:].bool()
+        else:
+            time_mask = self._missing_mask(X)
+        # Work in shape (n, c, s) so cummax runs along the contiguous last dimension
+        time_stamp = time_stamp.transpose(1, 2)
+        time_mask = time_mask.transpose(1, 2).contiguous()
+        # Time of previous observation (time delta is 0 at time 0 by definition)
+        obs_time = torch.where(time_mask, time_stamp, torch.full_like(time_stamp, -1))
+        obs_time[:, :, 0] = 0
+        obs_time = torch.cummax(obs_time, dim=-1)[0]
+        # Time delta i.e. time minus time of previous observation
         time_delta = torch.cat(
             (
-                time_delta[:, :, 0].unsqueeze(2),  # t = 0
-                time_stamp[:, :, 1:]
-                - time_delta[:, :, :-1],  # i.e. time minus time of previous observation
+                torch.zeros_like(obs_time[:, :, 0:1]),
+                time_stamp[:, :, 1:] - obs_time[:, :, :-1],
             ),
-            dim=2,
+            dim=-1,
         )
         return time_delta.transpose(1, 2)
 
     def _split_data(self, X, y, length, stratify):
         """Split data (``X``, ``y``, ``length``) into training, validation and
-        (optional) test sets using stratified sampling."""
+        (optional) test sets using stratified sampling. Indices are split rather than
+        the data so each set is copied from ``X`` once."""
         random_state = np.random.RandomState(self.seed)
+        idx_all = np.arange(X.size(0))
+        stratify = stratify.numpy()
         if self.test_prop > EPS:
             # Test split
-            test_nontest_split = train_test_split(
-                X,
-                y,
-                length,
-                stratify,
+            idx_test, idx_nontest = train_test_split(
+                idx_all,
                 train_size=self.test_prop,
                 random_state=random_state,
                 shuffle=True,
                 stratify=stratify,
             )
-            (
-                X_test,
-                X_nontest,
-                y_test,
-                y_nontest,
-                length_test,
-                length_nontest,
-                _,
-                stratify_nontest,
-            ) = test_nontest_split
-            # Validation/train split
-            val_train_split = train_test_split(
-                X_nontest,
-                y_nontest,
-                length_nontest,
-                train_size=self.val_prop,
-                random_state=random_state,
-                shuffle=True,
-                stratify=stratify_nontest,
-            )
-            X_val, X_train, y_val, y_train, length_val, length_train = val_train_split
+            stratify_nontest = stratify[idx_nontest]
         else:
-            # Validation/train split
-            val_train_split = train_test_split(
-                X,
-                y,
-                length,
-                train_size=self.val_prop,
-                random_state=random_state,
-                shuffle=True,
-                stratify=stratify,
-            )
-            X_val, X_train, y_val, y_train, length_val, length_train = val_train_split
-            X_test, y_test, length_test = float("nan"), float("nan"), float("nan")
-        return (
-            X_train,
-            y_train,
-            length_train,
-            X_val,
-            y_val,
-            length_val,
-            X_test,
-            y_test,
-            length_test,
+            idx_test, idx_nontest = None, idx_all
+            stratify_nontest = stratify
+        # Validation/train split
+        idx_val, idx_train = train_test_split(
+            idx_nontest,
+            train_size=self.val_prop,
+            random_state=random_state,
+            shuffle=True,
+            stratify=stratify_nontest,
         )
+        splits = []
+        for idx in [idx_train, idx_val, idx_test]:
+            if idx is None:
+                splits += [float("nan"), float("nan"), float("nan")]
+            else:
+                idx = torch.from_numpy(idx)
+                splits += [tensor.index_select(0, idx) for tensor in [X, y, length]]
+        return tuple(splits)
 
     def __len__(self):
         return self.X.size(0)
@@ -629,6 +801,18 @@ class PhysioNet2012(_TimeSeriesDataset):
             `Che et al (2018) <https://doi.org/10.1038/s41598-018-24271-9>`_. Default
             False.
         standardise: Standardise the time series (default False).
+        dtype: Floating point precision of ``X`` (default ``torch.float32``). Reduced
+            precision, for example ``torch.bfloat16``, halves the memory required. If
+            ``time`` or ``delta`` is True, time stamps must be stored exactly so
+            ``dtype`` is only supported for trajectories of up to 257 time points for
+            ``torch.bfloat16`` (2,049 for ``torch.float16``).
+        pin_memory: Return data in pinned memory for faster transfer to a CUDA device
+            (default False). Use ``.to(device, non_blocking=True)`` in the training loop
+            and do not also set ``pin_memory`` in the DataLoader.
+        share_memory: Move the returned split to shared memory so DataLoader worker
+            processes started with *spawn* do not each copy it (default False). Not
+            required if ``num_workers=0`` or workers are forked. Note shared memory is
+            limited in some environments, for example 64MB by default in Docker.
         overwrite_cache: Overwrite saved cache (default False).
         path: Location of the ``.torchtime`` cache directory (default ".").
         seed: Random seed for reproducibility (optional).
@@ -659,7 +843,8 @@ class PhysioNet2012(_TimeSeriesDataset):
         ``X``, ``y`` and ``length`` are available for the training, validation and test
         splits by appending ``_train``, ``_val`` and ``_test`` respectively. For
         example, ``y_val`` returns the labels for the validation data set. These
-        attributes are available regardless of the ``split`` argument.
+        attributes are available regardless of the ``split`` argument. Splits other
+        than ``split`` are standardised/imputed when first accessed.
 
     Returns:
         A PyTorch Dataset object which can be passed to a DataLoader.
@@ -675,6 +860,9 @@ class PhysioNet2012(_TimeSeriesDataset):
         mask: bool = False,
         delta: bool = False,
         standardise: bool = False,
+        dtype: torch.dtype = torch.float32,
+        pin_memory: bool = False,
+        share_memory: bool = False,
         overwrite_cache: bool = False,
         path: str = ".",
         seed: int = None,
@@ -692,6 +880,9 @@ class PhysioNet2012(_TimeSeriesDataset):
             mask=mask,
             delta=delta,
             standardise=standardise,
+            dtype=dtype,
+            pin_memory=pin_memory,
+            share_memory=share_memory,
             overwrite_cache=overwrite_cache,
             path=path,
             seed=seed,
@@ -700,7 +891,6 @@ class PhysioNet2012(_TimeSeriesDataset):
     def _get_data(self):
         """Download data and form ``X``, ``y``, ``length`` tensors."""
         outcome_path = self.dataset_path / "outcomes"
-        all_X = [None for _ in PHYSIONET_2012_DATASETS]
         # Download and extract data
         _physionet_download(
             PHYSIONET_2012_DATASETS, self.dataset_path, self.overwrite_cache
@@ -715,82 +905,106 @@ class PhysioNet2012(_TimeSeriesDataset):
             self.dataset_path / directory for directory in PHYSIONET_2012_DATASETS
         ]
         data_files = _get_file_list(data_directories)
-        length = self._get_lengths(data_files)
-        for i, files in enumerate(data_files):
-            all_X[i] = self._process_files(files, max(length), PHYSIONET_2012_VARS)
+        X, length = self._process_files(
+            [file for files in data_files for file in files], PHYSIONET_2012_VARS
+        )
         # Prepare labels
         outcome_files = _get_file_list(outcome_path)
-        all_y = self._get_labels(outcome_files, data_files)
+        y = self._get_labels(outcome_files, data_files)
         # Form tensors
-        X = torch.cat(all_X)
+        X = torch.from_numpy(X)
         X[X == -1] = float("nan")  # replace -1 missing data indicator with NaNs
-        y = torch.cat(all_y)
         length = torch.tensor(length)
         return X, y, length
 
     @staticmethod
-    def _get_lengths(data_files):
-        """Get length of each time series."""
-        lengths = []
-        for files in data_files:
-            for file_j in tqdm(
-                files,
-                total=len(files),
-                bar_format=TQDM_FORMAT,
-            ):
-                with open(file_j) as file:
-                    reader = csv.reader(file, delimiter=",")
-                    lengths_j = []
-                    for k, row in enumerate(reader):
-                        if k > 0 and row[1] != "":  # ignore head and rows without data
-                            lengths_j.append(row[0])
-                    lengths_j = set(lengths_j)
-                    lengths.append(len(lengths_j))
-        return lengths
-
-    @staticmethod
-    def _process_files(files, max_length, channels):
-        """Process ``.txt`` files."""
-        X = np.full((len(files), max_length, len(channels)), float("nan"))
-        template_dataframe = pd.DataFrame(columns=channels)
-        for i, file_i in tqdm(
-            enumerate(files),
-            total=len(files),
-            bar_format=TQDM_FORMAT,
-        ):
-            with open(file_i) as file:
-                Xi = pd.read_csv(file)
-                Xi = Xi.pivot_table(index="Time", columns="Parameter", values="Value")
-                Xi["Mins"] = [int(t[:2]) * 60 + int(t[3:]) for t in Xi.index]
-                Xi = pd.concat([template_dataframe, Xi])
-                Xi = Xi.apply(pd.to_numeric, downcast="float")
-                # Add static variables
-                Xi["Age"] = Xi.loc["00:00", "Age"]
-                Xi["Gender"] = Xi.loc["00:00", "Gender"]
-                Xi["Height"] = Xi.loc["00:00", "Height"]
-                # One-hot encode ICUType
-                icu_classes = 4
-                icu_onehot = np.eye(icu_classes)[int(Xi.loc["00:00", "ICUType"]) - 1]
-                for j in range(icu_classes):
-                    Xi["ICUType" + str(j + 1)] = icu_onehot[j]
-                X[i, : Xi.shape[0], :] = Xi[channels]
-                # TODO: only include time 0 if a weight is provided
-        return torch.tensor(X)
+    def _process_files(files, channels):
+        """Process ``.txt`` files. Returns an array of shape (*n*, *s*, *c*) and the
+        length of each time series. The files are combined and processed together."""
+        all_Xi = _parallel_parse(pd.read_csv, files)
+        data = pd.concat(all_Xi, ignore_index=True)
+        patient = np.repeat(np.arange(len(all_Xi)), [Xi.shape[0] for Xi in all_Xi])
+        # Index each patient/time stamp pair
+        times, time_code = np.unique(
+            data["Time"].to_numpy(dtype=str), return_inverse=True
+        )
+        stamp = patient * times.size + time_code
+        # Number of time stamps ignoring rows without data
+        has_param = data["Parameter"].notna().to_numpy()
+        length = np.bincount(
+            np.unique(stamp[has_param]) // times.size, minlength=len(all_Xi)
+        )
+        # Mean value of each parameter at each time stamp
+        observed = has_param & data["Value"].notna().to_numpy()
+        params, param_code = np.unique(
+            data.loc[observed, "Parameter"].to_numpy(dtype=str), return_inverse=True
+        )
+        stamps, stamp_code = np.unique(stamp[observed], return_inverse=True)
+        cells, cell_code = np.unique(
+            stamp_code * params.size + param_code, return_inverse=True
+        )
+        values = np.bincount(
+            cell_code, weights=data.loc[observed, "Value"].to_numpy(dtype=float)
+        ) / np.bincount(cell_code)
+        cell_stamp, cell_param = np.divmod(cells, params.size)
+        stamp_patient, stamp_time = np.divmod(stamps, times.size)
+        # Position of each time stamp in its time series
+        time_idx = np.arange(stamps.size) - np.searchsorted(
+            stamp_patient, stamp_patient
+        )
+        # Form time series channels
+        channel_idx = {channel: j for j, channel in enumerate(channels)}
+        X = np.full(
+            (len(all_Xi), length.max(), len(channels)), float("nan"), dtype=np.float32
+        )
+        param_channels = np.array([channel_idx.get(param, -1) for param in params])
+        in_channels = param_channels[cell_param] >= 0  # ignore non-channel parameters
+        X[
+            stamp_patient[cell_stamp[in_channels]],
+            time_idx[cell_stamp[in_channels]],
+            param_channels[cell_param[in_channels]],
+        ] = values[in_channels]
+        hours_mins = np.char.partition(times[stamp_time], ":")  # split "HH:MM"
+        X[stamp_patient, time_idx, channel_idx["Mins"]] = hours_mins[:, 0].astype(
+            int
+        ) * 60 + hours_mins[:, 2].astype(int)
+        # Add static variables
+        t0 = times[stamp_time] == "00:00"
+        t0_time = np.full(len(all_Xi), -1)
+        t0_time[stamp_patient[t0]] = time_idx[t0]
+        assert np.all(t0_time >= 0), "corrupt file, time 00:00 missing for a patient"
+        static = [channel_idx[static] for static in ["Age", "Gender", "Height"]]
+        X[stamp_patient[:, None], time_idx[:, None], static] = X[
+            np.arange(len(all_Xi))[:, None], t0_time[:, None], static
+        ][stamp_patient]
+        # One-hot encode ICUType
+        icu_cells = t0[cell_stamp] & (params[cell_param] == "ICUType")
+        icu_type = np.full(len(all_Xi), float("nan"))
+        icu_type[stamp_patient[cell_stamp[icu_cells]]] = values[icu_cells]
+        assert not np.any(
+            np.isnan(icu_type)
+        ), "corrupt file, ICUType missing at time 00:00 for a patient"
+        icu_channels = [channel_idx["ICUType" + str(j + 1)] for j in range(4)]
+        X[
+            stamp_patient[:, None], time_idx[:, None], icu_channels
+        ] = PHYSIONET_2012_ICU_ONEHOT[icu_type.astype(int) - 1][stamp_patient]
+        # TODO: only include time 0 if a weight is provided
+        return X, length.tolist()
 
     @staticmethod
     def _get_labels(outcome_files, data_files):
-        """Process outcome files."""
+        """Process outcome files. Returns a tensor of shape (*n*, 1)."""
         y = []
-        for i, file_i in enumerate(outcome_files):
-            ids = data_files[i]
-            with open(file_i) as file:
-                y_i = pd.read_csv(
-                    file, index_col=0, usecols=["RecordID", "In-hospital_death"]
-                )
-                ids_i = [int(id.stem) for id in ids]
-                y_i = torch.tensor(y_i.loc[ids_i].values)
-                y.append(y_i)
-        return y
+        for file_i, ids in zip(outcome_files, data_files):
+            ids_i = np.fromiter((int(id.stem) for id in ids), np.int64, len(ids))
+            y_i = pd.read_csv(
+                file_i, index_col="RecordID", usecols=["RecordID", "In-hospital_death"]
+            )
+            assert np.all(
+                np.isin(ids_i, y_i.index)
+            ), "corrupt file, outcome missing for a patient"
+            y.append(y_i.reindex(ids_i).to_numpy(np.int8))
+        return torch.from_numpy(np.concatenate(y))
 
 
 class PhysioNet2019(_TimeSeriesDataset):
@@ -827,6 +1041,18 @@ class PhysioNet2019(_TimeSeriesDataset):
             `Che et al (2018) <https://doi.org/10.1038/s41598-018-24271-9>`_. Default
             False.
         standardise: Standardise the time series (default False).
+        dtype: Floating point precision of ``X`` (default ``torch.float32``). Reduced
+            precision, for example ``torch.bfloat16``, halves the memory required. If
+            ``time`` or ``delta`` is True, time stamps must be stored exactly so
+            ``dtype`` is only supported for trajectories of up to 257 time points for
+            ``torch.bfloat16`` (2,049 for ``torch.float16``).
+        pin_memory: Return data in pinned memory for faster transfer to a CUDA device
+            (default False). Use ``.to(device, non_blocking=True)`` in the training loop
+            and do not also set ``pin_memory`` in the DataLoader.
+        share_memory: Move the returned split to shared memory so DataLoader worker
+            processes started with *spawn* do not each copy it (default False). Not
+            required if ``num_workers=0`` or workers are forked. Note shared memory is
+            limited in some environments, for example 64MB by default in Docker.
         overwrite_cache: Overwrite saved cache (default False).
         path: Location of the ``.torchtime`` cache directory (default ".").
         seed: Random seed for reproducibility (optional).
@@ -857,7 +1083,8 @@ class PhysioNet2019(_TimeSeriesDataset):
         ``X``, ``y`` and ``length`` are available for the training, validation and test
         splits by appending ``_train``, ``_val`` and ``_test`` respectively. For
         example, ``y_val`` returns the labels for the validation data set. These
-        attributes are available regardless of the ``split`` argument.
+        attributes are available regardless of the ``split`` argument. Splits other
+        than ``split`` are standardised/imputed when first accessed.
 
     Returns:
         A PyTorch Dataset object which can be passed to a
@@ -874,6 +1101,9 @@ class PhysioNet2019(_TimeSeriesDataset):
         mask: bool = False,
         delta: bool = False,
         standardise: bool = False,
+        dtype: torch.dtype = torch.float32,
+        pin_memory: bool = False,
+        share_memory: bool = False,
         overwrite_cache: bool = False,
         path: str = ".",
         seed: int = None,
@@ -888,6 +1118,9 @@ class PhysioNet2019(_TimeSeriesDataset):
             mask=mask,
             delta=delta,
             standardise=standardise,
+            dtype=dtype,
+            pin_memory=pin_memory,
+            share_memory=share_memory,
             overwrite_cache=overwrite_cache,
             path=path,
             seed=seed,
@@ -902,57 +1135,38 @@ class PhysioNet2019(_TimeSeriesDataset):
         data_directories = [self.path / dataset for dataset in PHYSIONET_2019_DATASETS]
         data_files = _get_file_list(data_directories)
         length, channels = self._get_lengths_channels(data_files)
-        all_X = [None for _ in PHYSIONET_2019_DATASETS]
-        all_y = [None for _ in PHYSIONET_2019_DATASETS]
-        for i, files in enumerate(data_files):
-            all_X[i], all_y[i] = self._process_files(files, max(length), channels)
-        # Form tensors
-        X = torch.cat(all_X)
-        y = torch.cat(all_y)
-        length = torch.tensor(length)
-        return X, y, length
+        # Form tensors (each dataset is written into its slice of X and y)
+        X = np.full(
+            (len(length), max(length), channels - 1), float("nan"), dtype=np.float32
+        )
+        y = np.full((len(length), max(length), 1), float("nan"), dtype=np.float32)
+        offset = 0
+        for files in data_files:
+            self._process_files(files, channels, X, y, offset)
+            offset += len(files)
+        return torch.from_numpy(X), torch.from_numpy(y), torch.tensor(length)
 
     @staticmethod
-    def _get_lengths_channels(data_files, max_time=None):
-        """Get length of each time series and number of channels. Time series can be
-        truncated at a specific hour with the ``max_time`` argument."""
+    def _get_lengths_channels(data_files):
+        """Get length of each time series and number of channels."""
         lengths = []  # sequence lengths
-        channels = []  # number of channels
+        channels = set()  # number of channels
         for files in data_files:
-            for file_j in tqdm(files, total=len(files), bar_format=TQDM_FORMAT):
-                with open(file_j) as file:
-                    reader = csv.reader(file, delimiter="|")
-                    lengths_j = []
-                    for k, Xijk in enumerate(reader):
-                        channels.append(len(Xijk))
-                        if k > 0:  # ignore header
-                            if max_time:
-                                if int(Xijk[39]) <= max_time:
-                                    lengths_j.append(1)
-                            else:
-                                lengths_j.append(1)
-                    lengths.append(sum(lengths_j))
-        channels = list(set(channels))
+            all_lengths = _parallel_parse(_get_physionet_2019_length, files)
+            for length_j, channels_j in all_lengths:
+                lengths.append(length_j)
+                channels.add(channels_j)
+        channels = list(channels)
         assert len(channels) == 1, "corrupt file, delete data and re-run"
         return lengths, channels[0]
 
     @staticmethod
-    def _process_files(files, max_length, channels):
-        """Process ``.psv`` files."""
-        X = np.full((len(files), max_length, channels - 1), float("nan"))
-        y = np.full((len(files), max_length, 1), float("nan"))
-        for i, file_i in tqdm(
-            enumerate(files),
-            total=len(files),
-            bar_format=TQDM_FORMAT,
-        ):
-            with open(file_i) as file:
-                reader = csv.reader(file, delimiter="|")
-                for j, Xij in enumerate(reader):
-                    if j > 0:  # ignore header
-                        X[i, j - 1] = Xij[:-1]
-                        y[i, j - 1, 0] = Xij[-1]
-        return torch.tensor(X), torch.tensor(y)
+    def _process_files(files, channels, X, y, offset):
+        """Process ``.psv`` files into ``X`` and ``y`` starting at index ``offset``."""
+        all_Xi = _parallel_parse(_process_physionet_2019_file, files, channels)
+        for i, (Xi, yi) in enumerate(all_Xi, start=offset):
+            X[i, : Xi.shape[0]] = Xi
+            y[i, : yi.shape[0]] = yi
 
 
 class PhysioNet2019Binary(_TimeSeriesDataset):
@@ -994,6 +1208,18 @@ class PhysioNet2019Binary(_TimeSeriesDataset):
             `Che et al (2018) <https://doi.org/10.1038/s41598-018-24271-9>`_. Default
             False.
         standardise: Standardise the time series (default False).
+        dtype: Floating point precision of ``X`` (default ``torch.float32``). Reduced
+            precision, for example ``torch.bfloat16``, halves the memory required. If
+            ``time`` or ``delta`` is True, time stamps must be stored exactly so
+            ``dtype`` is only supported for trajectories of up to 257 time points for
+            ``torch.bfloat16`` (2,049 for ``torch.float16``).
+        pin_memory: Return data in pinned memory for faster transfer to a CUDA device
+            (default False). Use ``.to(device, non_blocking=True)`` in the training loop
+            and do not also set ``pin_memory`` in the DataLoader.
+        share_memory: Move the returned split to shared memory so DataLoader worker
+            processes started with *spawn* do not each copy it (default False). Not
+            required if ``num_workers=0`` or workers are forked. Note shared memory is
+            limited in some environments, for example 64MB by default in Docker.
         overwrite_cache: Overwrite saved cache (default False).
         path: Location of the ``.torchtime`` cache directory (default ".").
         seed: Random seed for reproducibility (optional).
@@ -1025,7 +1251,8 @@ class PhysioNet2019Binary(_TimeSeriesDataset):
         ``X``, ``y`` and ``length`` are available for the training, validation and test
         splits by appending ``_train``, ``_val`` and ``_test`` respectively. For
         example, ``y_val`` returns the labels for the validation data set. These
-        attributes are available regardless of the ``split`` argument.
+        attributes are available regardless of the ``split`` argument. Splits other
+        than ``split`` are standardised/imputed when first accessed.
 
     Returns:
         A PyTorch Dataset object which can be passed to a DataLoader.
@@ -1041,6 +1268,9 @@ class PhysioNet2019Binary(_TimeSeriesDataset):
         mask: bool = False,
         delta: bool = False,
         standardise: bool = False,
+        dtype: torch.dtype = torch.float32,
+        pin_memory: bool = False,
+        share_memory: bool = False,
         overwrite_cache: bool = False,
         path: str = ".",
         seed: int = None,
@@ -1058,6 +1288,9 @@ class PhysioNet2019Binary(_TimeSeriesDataset):
             mask=mask,
             delta=delta,
             standardise=standardise,
+            dtype=dtype,
+            pin_memory=pin_memory,
+            share_memory=share_memory,
             overwrite_cache=overwrite_cache,
             path=path,
             seed=seed,
@@ -1065,24 +1298,19 @@ class PhysioNet2019Binary(_TimeSeriesDataset):
 
     def _get_data(self):
         """Download data and form ``X``, ``y``, ``length`` tensors."""
-        # Download and extract data in "physionet2019" directory to avoid duplication
         cache_path = pathlib.Path() / self.path_arg / ".torchtime" / "physionet_2019"
-        _physionet_download(PHYSIONET_2019_DATASETS, cache_path, self.overwrite_cache)
-        # Prepare data
-        print("Processing data...")
-        data_directories = [cache_path / dataset for dataset in PHYSIONET_2019_DATASETS]
-        data_files = _get_file_list(data_directories)
-        length, channels = PhysioNet2019._get_lengths_channels(
-            data_files, max_time=self.max_time
-        )
-        all_X = [None for _ in PHYSIONET_2019_DATASETS]
-        all_y = [None for _ in PHYSIONET_2019_DATASETS]
-        for i, files in enumerate(data_files):
-            all_X[i], all_y[i] = self._process_files(files, max(length), channels)
-        # Form tensors
-        X = torch.cat(all_X)
-        y = torch.cat(all_y)
-        length = torch.tensor(length)
+        if (
+            _cache_exists(cache_path)
+            and not self.overwrite_cache
+            and _validate_cache(cache_path)
+        ):
+            # Form from PhysioNet 2019 cache rather than processing the data again
+            print("Processing data...")
+            X, y, length = self._truncate(
+                *[_load_cache(cache_path, obj) for obj in ["X", "y"]]
+            )
+        else:
+            X, y, length = self._process_data(cache_path)
         # Drop patients with zero length sequences
         patient_index = torch.arange(X.size(0)).masked_select(length != 0).int()
         X = X.index_select(index=patient_index, dim=0)
@@ -1092,23 +1320,45 @@ class PhysioNet2019Binary(_TimeSeriesDataset):
         self.path = pathlib.Path() / self.path_arg / ".torchtime" / self.DATASET_NAME
         return X, y, length
 
-    def _process_files(self, files, max_length, channels):
-        """Process ``.psv`` files."""
-        X = np.full((len(files), max_length, channels - 1), float("nan"))
-        y = np.full((len(files), 1), 0.0)
-        for i, file_i in tqdm(
-            enumerate(files),
-            total=len(files),
-            bar_format=TQDM_FORMAT,
-        ):
-            with open(file_i) as file:
-                reader = csv.reader(file, delimiter="|")
-                for j, Xij in enumerate(reader):
-                    if j > 0:  # ignore header
-                        if int(Xij[39]) <= self.max_time:
-                            X[i, j - 1] = Xij[:-1]
-                        y[i, 0] = max(y[i, 0], int(Xij[-1]))  # sepsis at any point
-        return torch.tensor(X), torch.tensor(y)
+    def _process_data(self, cache_path):
+        """Form ``X``, ``y``, ``length`` tensors from the PhysioNet 2019 data."""
+        # Download and extract data in "physionet2019" directory to avoid duplication
+        _physionet_download(PHYSIONET_2019_DATASETS, cache_path, self.overwrite_cache)
+        # Prepare data
+        print("Processing data...")
+        data_directories = [cache_path / dataset for dataset in PHYSIONET_2019_DATASETS]
+        data_files = _get_file_list(data_directories)
+        _, channels = PhysioNet2019._get_lengths_channels(data_files)
+        all_Xi = self._process_files(
+            [file for files in data_files for file in files], channels
+        )
+        length = [idx.size for idx, _, _ in all_Xi]  # observations up to max_time
+        # Form tensors
+        X = np.full(
+            (len(length), max(length), channels - 1), float("nan"), dtype=np.float32
+        )
+        y = np.full((len(length), 1), 0.0, dtype=np.float32)
+        for i, (idx, Xi, yi) in enumerate(all_Xi):
+            X[i, idx] = Xi
+            y[i, 0] = yi  # sepsis at any point
+        return torch.from_numpy(X), torch.from_numpy(y), torch.tensor(length)
+
+    def _truncate(self, X, y):
+        """Form ``X``, ``y``, ``length`` tensors from PhysioNet 2019 ``X`` and ``y``
+        tensors."""
+        observed = X[:, :, 39] <= self.max_time  # ICULOS channel
+        length = observed.sum(dim=1)
+        max_length = length.max()
+        X = X[:, :max_length].clone()
+        X[~observed[:, :max_length]] = float("nan")
+        y = torch.nan_to_num(y, nan=0.0).amax(dim=1)  # sepsis at any point
+        return X, y, length
+
+    def _process_files(self, files, channels):
+        """Process ``.psv`` files. Observations after ``max_time`` are dropped."""
+        return _parallel_parse(
+            _process_physionet_2019_binary_file, files, channels, self.max_time
+        )
 
 
 class UEA(_TimeSeriesDataset):
@@ -1171,6 +1421,18 @@ class UEA(_TimeSeriesDataset):
             `Che et al (2018) <https://doi.org/10.1038/s41598-018-24271-9>`_. Default
             False.
         standardise: Standardise the time series (default False).
+        dtype: Floating point precision of ``X`` (default ``torch.float32``). Reduced
+            precision, for example ``torch.bfloat16``, halves the memory required. If
+            ``time`` or ``delta`` is True, time stamps must be stored exactly so
+            ``dtype`` is only supported for trajectories of up to 257 time points for
+            ``torch.bfloat16`` (2,049 for ``torch.float16``).
+        pin_memory: Return data in pinned memory for faster transfer to a CUDA device
+            (default False). Use ``.to(device, non_blocking=True)`` in the training loop
+            and do not also set ``pin_memory`` in the DataLoader.
+        share_memory: Move the returned split to shared memory so DataLoader worker
+            processes started with *spawn* do not each copy it (default False). Not
+            required if ``num_workers=0`` or workers are forked. Note shared memory is
+            limited in some environments, for example 64MB by default in Docker.
         overwrite_cache: Overwrite saved cache (default False).
         path: Location of the ``.torchtime`` cache directory (default ".").
         seed: Random seed for reproducibility (optional).
@@ -1190,7 +1452,8 @@ class UEA(_TimeSeriesDataset):
             deltas.
 
             Where trajectories are of unequal lengths they are padded with ``NaNs`` to
-            the length of the longest trajectory in the data.
+            the length of the longest trajectory in the data. Channels shorter than
+            the other channels in a trajectory are also padded with ``NaNs``.
         y (Tensor): One-hot encoded label data. A tensor of shape (*n*, *l*) where *l*
             is the number of classes.
         length (Tensor): Length of each trajectory prior to padding. A tensor of shape
@@ -1200,7 +1463,8 @@ class UEA(_TimeSeriesDataset):
         ``X``, ``y`` and ``length`` are available for the training, validation and test
         splits by appending ``_train``, ``_val`` and ``_test`` respectively. For
         example, ``y_val`` returns the labels for the validation data set. These
-        attributes are available regardless of the ``split`` argument.
+        attributes are available regardless of the ``split`` argument. Splits other
+        than ``split`` are standardised/imputed when first accessed.
 
     Returns:
         A PyTorch Dataset object which can be passed to a DataLoader.
@@ -1220,6 +1484,9 @@ class UEA(_TimeSeriesDataset):
         mask: bool = False,
         delta: bool = False,
         standardise: bool = False,
+        dtype: torch.dtype = torch.float32,
+        pin_memory: bool = False,
+        share_memory: bool = False,
         overwrite_cache: bool = False,
         path: str = ".",
         seed: int = None,
@@ -1241,6 +1508,9 @@ class UEA(_TimeSeriesDataset):
             mask=mask,
             delta=delta,
             standardise=standardise,
+            dtype=dtype,
+            pin_memory=pin_memory,
+            share_memory=share_memory,
             overwrite_cache=overwrite_cache,
             path=path,
             seed=seed,
@@ -1251,32 +1521,27 @@ class UEA(_TimeSeriesDataset):
         train_path = path / (self.dataset_name + "_TRAIN.ts")
         test_path = path / (self.dataset_name + "_TEST.ts")
         # Download and extract archive
-        if not path.is_dir():
+        downloaded_files = _get_file_names(path)
+        if not {train_path.name, test_path.name} <= downloaded_files:
             _download_archive(url, path)
-        else:
-            downloaded_files = _get_file_list(path)
-            if train_path not in downloaded_files or test_path not in downloaded_files:
-                _download_archive(url, path)
+            downloaded_files = _get_file_names(path)
         # Verify download
-        downloaded_files = _get_file_list(path)
         assert (
-            train_path in downloaded_files
+            train_path.name in downloaded_files
         ), "{} not in downloaded archive, check {}".format(train_path, url)
         assert (
-            test_path in downloaded_files
+            test_path.name in downloaded_files
         ), "{} not in downloaded archive, check {}".format(test_path, url)
         return [train_path, test_path]
 
     @staticmethod
     def _extract_ts_files(data_files):
-        """Extract ``.ts`` data based on ``sktime.datasets.load_UCR_UEA_dataset()``."""
-        X = pd.DataFrame(dtype="object")
-        y = pd.Series(dtype="object")
-        for split in data_files:
-            contents = load_from_tsfile_to_dataframe(split)
-            X = pd.concat([X, pd.DataFrame(contents[0])])
-            y = pd.concat([y, pd.Series(contents[1])])
-        y = pd.Series.to_numpy(y, dtype=str)
+        """Extract ``.ts`` data. Returns the channels of each time series as a list of
+        arrays and the labels."""
+        # Parse the TRAIN/TEST files in parallel
+        all_contents = _parallel_parse(_load_ts_file, data_files)
+        X = [Xi for contents in all_contents for Xi in contents[0]]
+        y = np.concatenate([contents[1] for contents in all_contents]).astype(str)
         return X, y
 
     def _get_data(self):
@@ -1286,24 +1551,222 @@ class UEA(_TimeSeriesDataset):
         )
         print("Processing data...")
         X_raw, y_raw = self._extract_ts_files(data_files)
+        X, length = self._pad_ts_data(X_raw)
+        # One-hot encode labels (in ascending order)
+        classes, y_idx = np.unique(y_raw.astype(int), return_inverse=True)
+        y = torch.zeros((y_idx.size, classes.size))
+        y.scatter_(1, torch.from_numpy(y_idx).long().unsqueeze(1), 1.0)
+        return X, y, length
+
+    @staticmethod
+    def _pad_ts_data(X_raw):
+        """Form padded ``X`` and ``length`` tensors from the channels of each time
+        series."""
+        n, n_channels = len(X_raw), len(X_raw[0])
+        cells = [Xij for Xi in X_raw for Xij in Xi]  # trajectory then channel order
         # Length of each trajectory
-        channel_lengths = X_raw.apply(lambda Xi: Xi.apply(len), axis=1)
-        length = torch.tensor(channel_lengths.apply(max, axis=1).values)
-        # Form tensor with padded trajectories
-        X = torch.stack(
-            [self._pad(X_raw.iloc[i], length.max()) for i in range(len(X_raw))],
-            dim=0,
+        cell_lengths = np.fromiter(
+            (cell.shape[0] for cell in cells), dtype=np.int64, count=len(cells)
         )
-        # One-hot encode labels (start from zero)
-        y = torch.tensor(y_raw.astype(int))
-        if all(y != 0):
-            y -= 1
-        y = F.one_hot(y)
-        return X, y, length
+        length = torch.from_numpy(cell_lengths.reshape(n, n_channels).max(axis=1))
+        if np.all(cell_lengths == cell_lengths[0]):
+            # Equal length time series
+            X = np.stack(cells).reshape(n, n_channels, -1).transpose(0, 2, 1)
+            return torch.from_numpy(np.ascontiguousarray(X)), length
+        # Form tensor with padded trajectories in a single scatter
+        cell_idx = np.repeat(np.arange(len(cells)), cell_lengths)
+        time_idx = np.arange(cell_idx.size) - np.repeat(
+            np.cumsum(cell_lengths) - cell_lengths, cell_lengths
+        )
+        X = np.full((n, length.max(), n_channels), float("nan"), dtype=np.float32)
+        X[cell_idx // n_channels, time_idx, cell_idx % n_channels] = np.concatenate(
+            cells
+        )
+        return torch.from_numpy(X), length
 
-    def _pad(self, Xi, max_length):
-        """Pad trajectories to length ``max_length``."""
-        Xi = pad_sequence([torch.tensor(Xij) for Xij in Xi])
-        out = torch.full((max_length, Xi.size(1)), float("nan"))  # shape (s, c)
-        out[0 : Xi.size(0)] = Xi
-        return out
+
+class BatchedDataset(IterableDataset):
+    """**Iterates over a data set in batches.**
+
+    Returns batches from a ``torchtime.data`` data set as a named dictionary with
+    ``X``, ``y`` and ``length`` data. Each tensor is indexed once per batch rather than
+    once per sample before the samples are collated. Pass to a DataLoader with
+    ``batch_size=None`` (the DataLoader returns the batches as they are). Worker
+    processes are not required. If ``num_workers`` is set in the DataLoader, each
+    worker returns a share of the batches and each sample is still returned once per
+    epoch. For example:
+
+    .. testcode::
+
+        from torch.utils.data import DataLoader
+        from torchtime.data import UEA, BatchedDataset
+
+        char_traj = UEA(
+            dataset="CharacterTrajectories",
+            split="train",
+            train_prop=0.7,
+            seed=123,
+        )
+        dataloader = DataLoader(
+            BatchedDataset(char_traj, batch_size=32),
+            batch_size=None,
+        )
+        print(next(iter(dataloader))["X"].shape)
+
+    .. testoutput::
+
+        ...
+        torch.Size([32, 182, 4])
+
+    Args:
+        dataset: Data set from a ``torchtime.data`` class.
+        batch_size: Number of samples in each batch.
+        shuffle: Shuffle the data each epoch (default True).
+        drop_last: Drop the final batch if it is smaller than ``batch_size`` (default
+            False).
+        seed: Random seed for shuffling (optional). If the DataLoader has worker
+            processes, the order also depends on the DataLoader's random state e.g. its
+            ``generator`` argument.
+    """
+
+    def __init__(
+        self,
+        dataset: _TimeSeriesDataset,
+        batch_size: int,
+        shuffle: bool = True,
+        drop_last: bool = False,
+        seed: int = None,
+    ) -> None:
+        assert (
+            type(batch_size) is int and batch_size > 0
+        ), "argument 'batch_size' must be a positive integer"
+        self.dataset = dataset
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.drop_last = drop_last
+        self.generator = _generator(seed)
+
+    def __len__(self):
+        n = len(self.dataset)
+        if self.drop_last:
+            return n // self.batch_size
+        return -(-n // self.batch_size)
+
+    def __iter__(self):
+        n = len(self.dataset)
+        worker_info = get_worker_info()
+        generator = self.generator
+        if worker_info is not None and self.shuffle:
+            # Workers get a copy of the generator each epoch, so seed a new generator
+            # using the DataLoader base seed (the same in all workers for an epoch)
+            base_seed = worker_info.seed - worker_info.id
+            generator = _generator(
+                (self.generator.initial_seed() + base_seed) % 2**63
+            )
+        if self.shuffle:
+            idx = torch.randperm(n, generator=generator)
+        else:
+            idx = torch.arange(n)
+        batches = idx[: len(self) * self.batch_size].split(self.batch_size)
+        if worker_info is not None:
+            # Each worker returns every num_workers-th batch
+            batches = batches[worker_info.id :: worker_info.num_workers]
+        for batch_idx in batches:
+            yield {
+                "X": self.dataset.X[batch_idx],
+                "y": self.dataset.y[batch_idx],
+                "length": self.dataset.length[batch_idx],
+            }
+
+
+class BucketBatchSampler(Sampler):
+    """**Batches samples of similar length.**
+
+    Samples are sorted by length and divided into ``n_buckets`` buckets. Each batch is
+    formed from samples in the same bucket. Pass to the ``batch_sampler`` argument of a
+    DataLoader with the `trim_to_length() <torchtime.collate.trim_to_length>`_ collate
+    function to remove padding beyond the longest sequence in each batch. For example:
+
+    .. testcode::
+
+        from torch.utils.data import DataLoader
+        from torchtime.data import UEA, BucketBatchSampler
+        from torchtime.collate import trim_to_length
+
+        char_traj = UEA(
+            dataset="CharacterTrajectories",
+            split="train",
+            train_prop=0.7,
+            seed=123,
+        )
+        dataloader = DataLoader(
+            char_traj,
+            batch_sampler=BucketBatchSampler(char_traj, batch_size=32, seed=123),
+            collate_fn=trim_to_length,
+        )
+
+    Args:
+        dataset: Data set from a ``torchtime.data`` class.
+        batch_size: Maximum number of samples in each batch.
+        n_buckets: Number of buckets (default 16).
+        shuffle: Shuffle the samples in each bucket and the order of the batches each
+            epoch (default True).
+        drop_last: Drop the final batch in each bucket if it is smaller than
+            ``batch_size`` (default False).
+        seed: Random seed for shuffling (optional). If the DataLoader has worker
+            processes, the order also depends on the DataLoader's random state e.g. its
+            ``generator`` argument.
+    """
+
+    def __init__(
+        self,
+        dataset: _TimeSeriesDataset,
+        batch_size: int,
+        n_buckets: int = 16,
+        shuffle: bool = True,
+        drop_last: bool = False,
+        seed: int = None,
+    ) -> None:
+        assert (
+            type(batch_size) is int and batch_size > 0
+        ), "argument 'batch_size' must be a positive integer"
+        assert (
+            type(n_buckets) is int and n_buckets > 0
+        ), "argument 'n_buckets' must be a positive integer"
+        self.length = dataset.length
+        self.batch_size = batch_size
+        self.n_buckets = n_buckets
+        self.shuffle = shuffle
+        self.drop_last = drop_last
+        self.generator = _generator(seed)
+
+    def __len__(self):
+        n, k = divmod(self.length.size(0), self.n_buckets)
+        bucket_sizes = [n + 1] * k + [n] * (self.n_buckets - k)
+        if self.drop_last:
+            return sum(size // self.batch_size for size in bucket_sizes)
+        return sum(-(-size // self.batch_size) for size in bucket_sizes)
+
+    def __iter__(self):
+        n = self.length.size(0)
+        if self.shuffle:
+            idx = torch.randperm(n, generator=self.generator)
+        else:
+            idx = torch.arange(n)
+        # Sort by length (ties are in random order if shuffled)
+        idx = idx[torch.sort(self.length[idx], stable=True)[1]]
+        batches = []
+        for bucket in idx.tensor_split(self.n_buckets):
+            if self.shuffle:
+                bucket = bucket[
+                    torch.randperm(bucket.size(0), generator=self.generator)
+                ]
+            n_batches = bucket.size(0) // self.batch_size
+            if not self.drop_last:
+                n_batches = -(-bucket.size(0) // self.batch_size)
+            batches += bucket.split(self.batch_size)[:n_batches]
+        if self.shuffle:
+            order = torch.randperm(len(batches), generator=self.generator)
+            batches = [batches[i] for i in order]
+        for batch_idx in batches:
+            yield batch_idx.tolist()
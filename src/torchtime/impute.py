@@ -50,13 +50,14 @@ def replace_missing(input: Tensor, fill: Tensor, select: Tensor = None) -> Tenso
         ), "'select' must be a Tensor the same length as 'fill' ({})".format(
             fill.size(0)
         )
-    # Replace missing values by channel
+    # Replace missing values in all selected channels at once (fill values are
+    # assigned to the selected channels in channel order)
     output = input.clone()
-    j = 0
-    for i, channel in enumerate(torch.unbind(output, dim=-1)):
-        if i in select:
-            channel.nan_to_num_(fill[j])
-            j += 1
+    channels = torch.unique(select.long())
+    fill = fill[: channels.size(0)].to(output.dtype)
+    output[..., channels] = torch.where(
+        torch.isnan(output[..., channels]), fill, output[..., channels]
+    )
     return output
 
 
@@ -93,16 +94,16 @@ def forward_impute(input: Tensor, fill: Tensor = None, select: Tensor = None) ->
     assert len(input.size()) >= 2, "Tensor 'input' must have at least two dimensions"
     if select is None:
         select = torch.arange(input.size(-1))
-    # Last observation carried forward (all channels)
-    x = input.transpose(-2, -1)  # shape (n, c, s)
+    # Last observation carried forward (selected channels)
+    x = input[..., select].transpose(-2, -1)  # shape (n, c, s)
     x_mask = torch.logical_not(torch.isnan(x))
     x_mask = torch.cummax(x_mask, -1)[1]
     x_imputed = x.gather(-1, x_mask)
     x_imputed = x_imputed.transpose(-2, -1)  # shape (n, s, c)
     # Update selected channels with imputed data
-    output = input.index_copy(-1, select, x_imputed[..., select])
+    output = input.index_copy(-1, select, x_imputed)
     # Fill initial NaNs
-    if torch.sum(torch.isnan(output[..., select])) > 0:
+    if torch.isnan(output[..., select]).any():
         assert fill is not None, "argument 'fill' must be provided"
         output = replace_missing(output, fill, select)
     return output
@@ -1,9 +1,15 @@
 import hashlib
+import inspect
+import itertools
+import json
+import multiprocessing
 import os
 import re
+import sys
 import tarfile
 import tempfile
 import zipfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path, PosixPath
 from urllib.parse import urlparse
 
@@ -12,14 +18,66 @@ import requests
 import torch
 from tqdm import tqdm
 
-from torchtime.constants import CHECKSUM_EXT, DATASET_OBJS, OBJ_EXT, TQDM_FORMAT
+from torchtime.constants import (
+    CACHE_MANIFEST,
+    CHECKSUM_EXT,
+    DATASET_OBJS,
+    OBJ_EXT,
+    PREFETCH_THREADS,
+    TQDM_FORMAT,
+)
 
 # Utilities ----------------------------------------------------------------------------
 
 
 def _nanmode(input):
-    """Mode value for tensor ignoring ``NaN``s."""
-    return torch.mode(input[~torch.isnan(input)])[0]
+    """Mode value for each channel (final dimension) of a tensor ignoring ``NaN``s. The
+    smallest value is returned if there are multiple modes as in ``torch.mode()``.
+    Returns ``NaN`` if there are no observed values in a channel."""
+    n_channels = input.size(-1)
+    input = input.reshape(-1, n_channels)
+    observed = torch.logical_not(torch.isnan(input))
+    channels = torch.arange(n_channels).expand_as(input)[observed]
+    # Unique (channel, value) pairs sorted by channel then value
+    pairs, counts = torch.unique(
+        torch.stack([channels.double(), input[observed].double()]),
+        dim=1,
+        return_counts=True,
+    )
+    pair_channels = pairs[0].long()
+    # Most frequent value(s) in each channel
+    max_counts = torch.zeros(n_channels, dtype=counts.dtype)
+    max_counts = max_counts.scatter_reduce(0, pair_channels, counts, "amax")
+    is_mode = counts == max_counts[pair_channels]
+    # Smallest mode i.e. first in sorted order
+    mode_idx = torch.full((n_channels,), counts.size(0))
+    mode_idx = mode_idx.scatter_reduce(
+        0, pair_channels[is_mode], torch.arange(counts.size(0))[is_mode], "amin"
+    )
+    modes = torch.full((n_channels,), float("nan"), dtype=input.dtype)
+    has_mode = mode_idx < counts.size(0)
+    modes[has_mode] = pairs[1, mode_idx[has_mode]].to(input.dtype)
+    return modes
+
+
+def _parallel_parse(parse_fn, files, *args):
+    """Returns ``parse_fn(file, *args)`` for each file in ``files``. Files are processed
+    in parallel by forked worker processes on Linux. On other platforms, spawned
+    processes re-import the calling script so files are processed by a small pool of
+    threads instead. This overlaps reading files from disk with parsing."""
+    iterables = [files] + [itertools.repeat(arg) for arg in args]
+    if len(files) <= 1:
+        results = map(parse_fn, *iterables)
+        return list(tqdm(results, total=len(files), bar_format=TQDM_FORMAT))
+    if sys.platform.startswith("linux"):
+        executor = ProcessPoolExecutor(mp_context=multiprocessing.get_context("fork"))
+        chunksize = 64
+    else:
+        executor = ThreadPoolExecutor(max_workers=PREFETCH_THREADS)
+        chunksize = 1  # ignored by ThreadPoolExecutor
+    with executor:
+        results = executor.map(parse_fn, *iterables, chunksize=chunksize)
+        return list(tqdm(results, total=len(files), bar_format=TQDM_FORMAT))
 
 
 # Sampling -----------------------------------------------------------------------------
@@ -60,6 +118,14 @@ def _get_file_list(directories):
     return all_files
 
 
+def _get_file_names(directory):
+    """Returns the set of file names in ``directory`` (empty if it does not exist)."""
+    if not os.path.isdir(directory):
+        return set()
+    with os.scandir(directory) as entries:
+        return {entry.name for entry in entries if entry.is_file()}
+
+
 def _simulate_missing(X, missing, generator=None, seed=None):
     """Simulate missing data by modifying ``X`` in place."""
     length = X.size(1)
@@ -200,11 +266,11 @@ def _physionet_download(urls, path, overwrite=False):
 def _get_SHA256(file):
     """Get SHA256 for file."""
     with open(file, "rb") as check_file:
+        if hasattr(hashlib, "file_digest"):  # Python 3.11+
+            return hashlib.file_digest(check_file, "sha256").hexdigest()
         checksum = hashlib.sha256()
-        chunk = check_file.read(8192)
-        while chunk:
+        while chunk := check_file.read(1 << 20):  # 1 MiB chunks
             checksum.update(chunk)
-            chunk = check_file.read(8192)
     return checksum.hexdigest()
 
 
@@ -219,22 +285,22 @@ def _check_SHA256(file, check_file):
 # Cache data ---------------------------------------------------------------------------
 
 
-def _cache_exists(path):
+def _cache_exists(path, objs=DATASET_OBJS):
     """Check cached data exists."""
     return all(
         [
             (path / (obj + OBJ_EXT)).is_file()
             and (path / (obj + CHECKSUM_EXT)).is_file()
-            for obj in DATASET_OBJS
+            for obj in objs
         ]
     )
 
 
-def _validate_cache(path):
+def _validate_cache(path, objs=DATASET_OBJS):
     """Validate checksums for cache."""
     print("Validating cache...")
     valid_cache = True
-    for obj in DATASET_OBJS:
+    for obj in objs:
         file_path = path / (obj + OBJ_EXT)
         sha_path = path / (obj + CHECKSUM_EXT)
         if not _check_SHA256(file_path, sha_path):
@@ -244,15 +310,66 @@ def _validate_cache(path):
     return valid_cache
 
 
-def _cache_data(path, X, y, length):
+def _cache_data(path, *tensors, objs=DATASET_OBJS):
     """Cache tensors and checksums."""
     # Make cache directory
     if not path.is_dir():
         os.makedirs(path)
     # Save objects
-    for i, obj in enumerate([X, y, length]):
-        obj_path = path / (DATASET_OBJS[i] + OBJ_EXT)
-        sha_path = path / (DATASET_OBJS[i] + CHECKSUM_EXT)
+    for i, obj in enumerate(tensors):
+        obj_path = path / (objs[i] + OBJ_EXT)
+        sha_path = path / (objs[i] + CHECKSUM_EXT)
         torch.save(obj, obj_path)
         with open(sha_path, "w") as f:
             f.write(_get_SHA256(obj_path))
+
+
+def _load_cache(path, obj):
+    """Load a cached tensor. The file is memory mapped where supported (PyTorch 2.1+)
+    so pages are read lazily rather than loading the whole tensor into memory."""
+    if "mmap" in inspect.signature(torch.load).parameters:
+        kwargs = {"mmap": True, "weights_only": True}
+    else:
+        kwargs = {}
+    return torch.load(path / (obj + OBJ_EXT), map_location="cpu", **kwargs)
+
+
+def _channels_cache_name(options):
+    """Cache object name for ``X`` with channels formed using ``options``."""
+    options_sha = hashlib.sha256(json.dumps(options, sort_keys=True).encode())
+    return "X_" + options_sha.hexdigest()[:16]
+
+
+def _get_manifest(path):
+    """Returns the cache manifest i.e. options used to form each ``X`` variant."""
+    manifest_path = path / CACHE_MANIFEST
+    if manifest_path.is_file():
+        with open(manifest_path) as f:
+            return json.load(f)
+    return {}
+
+
+def _cache_channels(path, obj, X, options):
+    """Cache ``X`` with added channels and record ``options`` in the cache
+    manifest."""
+    _cache_data(path, X, objs=[obj])
+    manifest = _get_manifest(path)
+    manifest[obj] = options
+    with open(path / CACHE_MANIFEST, "w") as f:
+        json.dump(manifest, f, indent=4)
+
+
+def _clear_cache(path, objs):
+    """Delete cached objects and their checksums."""
+    for obj in objs:
+        for ext in [OBJ_EXT, CHECKSUM_EXT]:
+            file_path = path / (obj + ext)
+            if file_path.is_file():
+                os.remove(file_path)
+
+
+def _clear_channels_cache(path):
+    """Delete cached ``X`` variants listed in the cache manifest."""
+    _clear_cache(path, _get_manifest(path))
+    if (path / CACHE_MANIFEST).is_file():
+        os.remove(path / CACHE_MANIFEST)
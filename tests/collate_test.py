@@ -1,9 +1,12 @@
+import pytest
 import torch
 from torch.nn.utils.rnn import PackedSequence
 from torch.utils.data import DataLoader
 
-from torchtime.collate import packed_sequence, sort_by_length
-from torchtime.data import UEA
+from torchtime.collate import packed_sequence, sort_by_length, trim_to_length
+from torchtime.data import UEA, BatchedDataset, BucketBatchSampler
+
+pytestmark = pytest.mark.xdist_group(name="uea_CharacterTrajectories")
 
 
 class TestCollateFunctions:
@@ -35,3 +38,58 @@ class TestCollateFunctions:
         next_batch = next(iter(loader))
         # Check X is a PackedSequence object
         assert type(next_batch["X"]) is PackedSequence
+
+    def test_batched_dataset(self):
+        dataset = UEA(
+            dataset="CharacterTrajectories",
+            split="train",
+            train_prop=0.7,
+            val_prop=0.2,
+        )
+        batched_dataset = BatchedDataset(dataset, batch_size=32, shuffle=False)
+        loader = DataLoader(batched_dataset, batch_size=None)
+        batches = list(loader)
+        assert len(batches) == len(batched_dataset)
+        # Check batches match a standard DataLoader
+        for batch, expect_batch in zip(batches, DataLoader(dataset, batch_size=32)):
+            assert torch.allclose(batch["X"], expect_batch["X"], equal_nan=True)
+            assert torch.equal(batch["y"], expect_batch["y"])
+            assert torch.equal(batch["length"], expect_batch["length"])
+
+    def test_batched_dataset_workers(self):
+        dataset = UEA(
+            dataset="CharacterTrajectories",
+            split="train",
+            train_prop=0.7,
+            val_prop=0.2,
+        )
+        # Batches are shared between workers
+        batched_dataset = BatchedDataset(dataset, batch_size=32, shuffle=False)
+        loader = DataLoader(batched_dataset, batch_size=None, num_workers=2)
+        batches = list(loader)
+        assert len(batches) == len(batched_dataset)
+        for batch, expect_batch in zip(batches, DataLoader(dataset, batch_size=32)):
+            assert torch.allclose(batch["X"], expect_batch["X"], equal_nan=True)
+            assert torch.equal(batch["length"], expect_batch["length"])
+        # Each sample is returned once if shuffled
+        batched_dataset = BatchedDataset(dataset, batch_size=32, seed=456789)
+        loader = DataLoader(batched_dataset, batch_size=None, num_workers=2)
+        length = torch.cat([batch["length"] for batch in loader])
+        assert torch.equal(length.sort()[0], dataset.length.sort()[0])
+
+    def test_bucket_batch_sampler(self):
+        dataset = UEA(
+            dataset="CharacterTrajectories",
+            split="train",
+            train_prop=0.7,
+            val_prop=0.2,
+        )
+        sampler = BucketBatchSampler(dataset, batch_size=32, seed=456789)
+        loader = DataLoader(dataset, batch_sampler=sampler, collate_fn=trim_to_length)
+        batches = list(loader)
+        assert len(batches) == len(sampler)
+        # Check each sample is returned once
+        assert sum(batch["length"].size(0) for batch in batches) == len(dataset)
+        # Check padding is trimmed to the longest sequence in each batch
+        for batch in batches:
+            assert batch["X"].size(1) == batch["length"].max()
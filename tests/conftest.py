@@ -0,0 +1,75 @@
+import functools
+import os
+
+import pytest
+
+from torchtime.data import UEA
+from torchtime.utils import _get_SHA256
+
+
+def _impute_with_zero(X, y, fill, select):
+    """Custom imputation function that replaces missing values with zero."""
+    return X.nan_to_num(0), y.nan_to_num(0)
+
+
+def _no_imputation(X, y, fill, select):
+    """Custom imputation function that does not impute i.e. same as
+    ``impute="none"``."""
+    return X, y
+
+
+@functools.lru_cache(maxsize=None)
+def _file_SHA256(file, mtime_ns, size):
+    """SHA256 for ``file`` with modification time ``mtime_ns`` and ``size`` bytes."""
+    return _get_SHA256(file)
+
+
+def _cached_SHA256(file):
+    """Get SHA256 for file. Checksums are memoised by path, modification time and size
+    so a cache file that is unchanged between tests is only hashed once."""
+    stat = os.stat(file)
+    return _file_SHA256(os.path.abspath(file), stat.st_mtime_ns, stat.st_size)
+
+
+@pytest.fixture(scope="session")
+def get_SHA256():
+    """Get SHA256 for file, memoised for the test session."""
+    return _cached_SHA256
+
+
+@pytest.fixture
+def impute_with_zero():
+    """Custom imputation function that replaces missing values with zero."""
+    return _impute_with_zero
+
+
+@pytest.fixture
+def no_imputation():
+    """Custom imputation function that does not impute."""
+    return _no_imputation
+
+
+@pytest.fixture(scope="module")
+def dataset(request):
+    """UEA training/validation/test data set shared by tests that do not modify it.
+    The data set is given by ``DATASET`` in the test module."""
+    return UEA(
+        dataset=request.module.DATASET,
+        split="train",
+        train_prop=0.7,
+        val_prop=0.2,
+        seed=request.module.SEED,
+    )
+
+
+@pytest.fixture(scope="module")
+def dataset_missing(request):
+    """As ``dataset`` with simulated missing data."""
+    return UEA(
+        dataset=request.module.DATASET,
+        split="train",
+        train_prop=0.7,
+        val_prop=0.2,
+        missing=0.5,
+        seed=request.module.SEED,
+    )
@@ -1,11 +1,13 @@
 import re
 
+import numpy as np
 import pytest
 import torch
 
-from torchtime.constants import OBJ_EXT
+from torchtime.constants import OBJ_EXT, PHYSIONET_2012_VARS
 from torchtime.data import PhysioNet2012
-from torchtime.utils import _get_SHA256
+
+pytestmark = pytest.mark.xdist_group(name="physionet_2012")
 
 SEED = 456789
 RTOL = 1e-4
@@ -67,7 +69,7 @@ class TestPhysioNet2012:
                 seed=SEED,
             )
 
-    def test_load_data(self):
+    def test_load_data(self, get_SHA256):
         """Validate data set."""
         PhysioNet2012(
             split="train",
@@ -75,12 +77,12 @@ class TestPhysioNet2012:
             seed=SEED,
         )
         if CHECKSUM_X:
-            assert _get_SHA256(".torchtime/physionet_2012/X" + OBJ_EXT) == CHECKSUM_X
+            assert get_SHA256(".torchtime/physionet_2012/X" + OBJ_EXT) == CHECKSUM_X
         if CHECKSUM_Y:
-            assert _get_SHA256(".torchtime/physionet_2012/y" + OBJ_EXT) == CHECKSUM_Y
+            assert get_SHA256(".torchtime/physionet_2012/y" + OBJ_EXT) == CHECKSUM_Y
         if CHECKSUM_LENGTH:
             assert (
-                _get_SHA256(".torchtime/physionet_2012/length" + OBJ_EXT)
+                get_SHA256(".torchtime/physionet_2012/length" + OBJ_EXT)
                 == CHECKSUM_LENGTH
             )
 
@@ -143,9 +145,9 @@ class TestPhysioNet2012:
             seed=SEED,
         )
         # Check correct split is returned
-        assert torch.allclose(dataset.X, dataset.X_train, equal_nan=True)
-        assert torch.allclose(dataset.y, dataset.y_train, equal_nan=True)
-        assert torch.allclose(dataset.length, dataset.length_train, equal_nan=True)
+        assert dataset.X is dataset.X_train
+        assert dataset.y is dataset.y_train
+        assert dataset.length is dataset.length_train
 
     def test_val_split(self):
         """Test validation split is returned."""
@@ -156,9 +158,9 @@ class TestPhysioNet2012:
             seed=SEED,
         )
         # Check correct split is returned
-        assert torch.allclose(dataset.X, dataset.X_val, equal_nan=True)
-        assert torch.allclose(dataset.y, dataset.y_val, equal_nan=True)
-        assert torch.allclose(dataset.length, dataset.length_val, equal_nan=True)
+        assert dataset.X is dataset.X_val
+        assert dataset.y is dataset.y_val
+        assert dataset.length is dataset.length_val
 
     def test_test_split(self):
         """Test test split is returned."""
@@ -169,9 +171,9 @@ class TestPhysioNet2012:
             seed=SEED,
         )
         # Check correct split is returned
-        assert torch.allclose(dataset.X, dataset.X_test, equal_nan=True)
-        assert torch.allclose(dataset.y, dataset.y_test, equal_nan=True)
-        assert torch.allclose(dataset.length, dataset.length_test, equal_nan=True)
+        assert dataset.X is dataset.X_test
+        assert dataset.y is dataset.y_test
+        assert dataset.length is dataset.length_test
 
     def test_length(self):
         """Test length attribute."""
@@ -182,18 +184,15 @@ class TestPhysioNet2012:
             time=False,
             seed=SEED,
         )
-        for i, Xi in enumerate(dataset.X_train.unbind()):
-            length_i = dataset.length_train[i]
-            assert not torch.all(torch.isnan(Xi[length_i - 1]))
-            assert torch.all(torch.isnan(Xi[length_i:]))
-        for i, Xi in enumerate(dataset.X_val.unbind()):
-            length_i = dataset.length_val[i]
-            assert not torch.all(torch.isnan(Xi[length_i - 1]))
-            assert torch.all(torch.isnan(Xi[length_i:]))
-        for i, Xi in enumerate(dataset.X_test.unbind()):
-            length_i = dataset.length_test[i]
-            assert not torch.all(torch.isnan(Xi[length_i - 1]))
-            assert torch.all(torch.isnan(Xi[length_i:]))
+        for X, length in [
+            (dataset.X_train, dataset.length_train),
+            (dataset.X_val, dataset.length_val),
+            (dataset.X_test, dataset.length_test),
+        ]:
+            all_nan = torch.all(torch.isnan(X), dim=-1)  # shape (n, s)
+            padding = torch.arange(X.size(1)) >= length.unsqueeze(1)
+            assert not torch.any(all_nan[torch.arange(X.size(0)), length - 1])
+            assert torch.all(all_nan[padding])
 
     def test_invalid_impute(self):
         """Catch invalid impute arguments."""
@@ -236,47 +235,14 @@ class TestPhysioNet2012:
         assert torch.sum(torch.isnan(dataset.X_val)).item() == 20816762
         assert torch.sum(torch.isnan(dataset.X_test)).item() == 10416289
 
-    def test_zero_impute(self):
-        """Test zero imputation."""
-        dataset = PhysioNet2012(
-            split="train",
-            train_prop=0.7,
-            val_prop=0.2,
-            impute="zero",
-            seed=SEED,
-        )
-        # Check no NaNs post imputation
-        assert torch.sum(torch.isnan(dataset.X_train)).item() == 0
-        assert torch.sum(torch.isnan(dataset.y_train)).item() == 0
-        assert torch.sum(torch.isnan(dataset.X_val)).item() == 0
-        assert torch.sum(torch.isnan(dataset.y_val)).item() == 0
-        assert torch.sum(torch.isnan(dataset.X_test)).item() == 0
-        assert torch.sum(torch.isnan(dataset.y_test)).item() == 0
-
-    def test_mean_impute(self):
-        """Test mean imputation."""
-        dataset = PhysioNet2012(
-            split="train",
-            train_prop=0.7,
-            val_prop=0.2,
-            impute="mean",
-            seed=SEED,
-        )
-        # Check no NaNs post imputation
-        assert torch.sum(torch.isnan(dataset.X_train)).item() == 0
-        assert torch.sum(torch.isnan(dataset.y_train)).item() == 0
-        assert torch.sum(torch.isnan(dataset.X_val)).item() == 0
-        assert torch.sum(torch.isnan(dataset.y_val)).item() == 0
-        assert torch.sum(torch.isnan(dataset.X_test)).item() == 0
-        assert torch.sum(torch.isnan(dataset.y_test)).item() == 0
-
-    def test_forward_impute(self):
-        """Test forward imputation."""
+    @pytest.mark.parametrize("impute", ["zero", "mean", "forward"])
+    def test_impute(self, impute):
+        """Test zero, mean and forward imputation."""
         dataset = PhysioNet2012(
             split="train",
             train_prop=0.7,
             val_prop=0.2,
-            impute="forward",
+            impute=impute,
             seed=SEED,
         )
         # Check no NaNs post imputation
@@ -287,12 +253,8 @@ class TestPhysioNet2012:
         assert torch.sum(torch.isnan(dataset.X_test)).item() == 0
         assert torch.sum(torch.isnan(dataset.y_test)).item() == 0
 
-    def test_custom_imputation_1(self):
+    def test_custom_imputation_1(self, impute_with_zero):
         """Test custom imputation function."""
-
-        def impute_with_zero(X, y, fill, select):
-            return X.nan_to_num(0), y.nan_to_num(0)
-
         dataset = PhysioNet2012(
             split="train",
             train_prop=0.7,
@@ -305,12 +267,8 @@ class TestPhysioNet2012:
         assert torch.sum(torch.isnan(dataset.X_val)).item() == 0
         assert torch.sum(torch.isnan(dataset.X_test)).item() == 0
 
-    def test_custom_imputation_2(self):
+    def test_custom_imputation_2(self, no_imputation):
         """Test custom imputation function."""
-
-        def no_imputation(X, y, fill, select):
-            return X, y
-
         dataset = PhysioNet2012(
             split="train",
             train_prop=0.7,
@@ -323,7 +281,7 @@ class TestPhysioNet2012:
         assert torch.sum(torch.isnan(dataset.X_val)).item() == 20816762
         assert torch.sum(torch.isnan(dataset.X_test)).item() == 10416289
 
-    def test_overwrite_data(self):
+    def test_overwrite_data(self, get_SHA256):
         """Overwrite cache and validate data set."""
         PhysioNet2012(
             split="train",
@@ -332,12 +290,12 @@ class TestPhysioNet2012:
             overwrite_cache=True,
         )
         if CHECKSUM_X:
-            assert _get_SHA256(".torchtime/physionet_2012/X" + OBJ_EXT) == CHECKSUM_X
+            assert get_SHA256(".torchtime/physionet_2012/X" + OBJ_EXT) == CHECKSUM_X
         if CHECKSUM_Y:
-            assert _get_SHA256(".torchtime/physionet_2012/y" + OBJ_EXT) == CHECKSUM_Y
+            assert get_SHA256(".torchtime/physionet_2012/y" + OBJ_EXT) == CHECKSUM_Y
         if CHECKSUM_LENGTH:
             assert (
-                _get_SHA256(".torchtime/physionet_2012/length" + OBJ_EXT)
+                get_SHA256(".torchtime/physionet_2012/length" + OBJ_EXT)
                 == CHECKSUM_LENGTH
             )
 
@@ -355,19 +313,9 @@ class TestPhysioNet2012:
         assert dataset.X_val.shape == torch.Size([2400, 215, 46])
         assert dataset.X_test.shape == torch.Size([1200, 215, 46])
         # Check time channel
-        for i in range(215):
-            assert torch.equal(
-                dataset.X_train[:, i, 0],
-                torch.full([8400], fill_value=i, dtype=torch.float),
-            )
-            assert torch.equal(
-                dataset.X_val[:, i, 0],
-                torch.full([2400], fill_value=i, dtype=torch.float),
-            )
-            assert torch.equal(
-                dataset.X_test[:, i, 0],
-                torch.full([1200], fill_value=i, dtype=torch.float),
-            )
+        time_stamp = torch.arange(215, dtype=torch.float)
+        for X in [dataset.X_train, dataset.X_val, dataset.X_test]:
+            assert torch.equal(X[:, :, 0], time_stamp.expand(X.size(0), -1))
 
     def test_no_time(self):
         """Test time argument."""
@@ -438,19 +386,9 @@ class TestPhysioNet2012:
         assert dataset.X_val.shape == torch.Size([2400, 215, 136])
         assert dataset.X_test.shape == torch.Size([1200, 215, 136])
         # Check time channel
-        for i in range(215):
-            assert torch.equal(
-                dataset.X_train[:, i, 0],
-                torch.full([8400], fill_value=i, dtype=torch.float),
-            )
-            assert torch.equal(
-                dataset.X_val[:, i, 0],
-                torch.full([2400], fill_value=i, dtype=torch.float),
-            )
-            assert torch.equal(
-                dataset.X_test[:, i, 0],
-                torch.full([1200], fill_value=i, dtype=torch.float),
-            )
+        time_stamp = torch.arange(215, dtype=torch.float)
+        for X in [dataset.X_train, dataset.X_val, dataset.X_test]:
+            assert torch.equal(X[:, :, 0], time_stamp.expand(X.size(0), -1))
         # Check time delta channel
         assert torch.equal(
             dataset.X_train[:, 0, 91], torch.zeros([8400], dtype=torch.float)
@@ -471,22 +409,18 @@ class TestPhysioNet2012:
             standardise=True,
             seed=SEED,
         )
-        for c, Xc in enumerate(dataset.X_train.unbind(dim=-1)):
-            print(Xc)
-            assert torch.allclose(
-                torch.nanmean(Xc), torch.Tensor([0.0]), rtol=RTOL, atol=ATOL
-            )
-            assert torch.allclose(
-                torch.std(Xc[~torch.isnan(Xc)]),
-                torch.Tensor([1.0]),
-                rtol=RTOL,
-                atol=ATOL,
-            ) or torch.allclose(
-                torch.std(Xc[~torch.isnan(Xc)]),
-                torch.Tensor([0.0]),  # if all values are the same
-                rtol=RTOL,
-                atol=ATOL,
-            )
+        X = dataset.X_train
+        observed = ~torch.isnan(X)
+        means = torch.nanmean(X, dim=(0, 1))
+        stds = torch.sqrt(
+            torch.nansum((X - means) ** 2, dim=(0, 1)) / (observed.sum(dim=(0, 1)) - 1)
+        )
+        assert torch.allclose(means, torch.zeros_like(means), rtol=RTOL, atol=ATOL)
+        # Standard deviation is zero if all values in a channel are the same
+        assert torch.all(
+            torch.isclose(stds, torch.ones_like(stds), rtol=RTOL, atol=ATOL)
+            | torch.isclose(stds, torch.zeros_like(stds), rtol=RTOL, atol=ATOL)
+        )
 
     def test_reproducibility_1(self):
         """Test seed argument."""
@@ -497,15 +431,15 @@ class TestPhysioNet2012:
             seed=SEED,
         )
         # Check first value in 39th channel
-        assert torch.allclose(
-            dataset.X_train[0, 0, 39], torch.tensor(80.0), rtol=RTOL, atol=ATOL
-        )
-        assert torch.allclose(
-            dataset.X_val[0, 0, 39], torch.tensor(63.0), rtol=RTOL, atol=ATOL
-        )
-        assert torch.allclose(
-            dataset.X_test[0, 0, 39], torch.tensor(61.0), rtol=RTOL, atol=ATOL
+        actual = torch.stack(
+            [
+                dataset.X_train[0, 0, 39],
+                dataset.X_val[0, 0, 39],
+                dataset.X_test[0, 0, 39],
+            ]
         )
+        expected = torch.tensor([80.0, 63.0, 61.0])
+        assert torch.allclose(actual, expected, rtol=RTOL, atol=ATOL)
 
     def test_reproducibility_2(self):
         """Test seed argument."""
@@ -516,12 +450,96 @@ class TestPhysioNet2012:
             seed=999999,
         )
         # Check first value in 39th channel
-        assert torch.allclose(
-            dataset.X_train[0, 0, 39], torch.tensor(49.0), rtol=RTOL, atol=ATOL
-        )
-        assert torch.allclose(
-            dataset.X_val[0, 0, 39], torch.tensor(64.0), rtol=RTOL, atol=ATOL
-        )
-        assert torch.allclose(
-            dataset.X_test[0, 0, 39], torch.tensor(47.0), rtol=RTOL, atol=ATOL
-        )
+        actual = torch.stack(
+            [
+                dataset.X_train[0, 0, 39],
+                dataset.X_val[0, 0, 39],
+                dataset.X_test[0, 0, 39],
+            ]
+        )
+        expected = torch.tensor([49.0, 64.0, 47.0])
+        assert torch.allclose(actual, expected, rtol=RTOL, atol=ATOL)
+
+    @staticmethod
+    def _write_patient(path, record_id, rows):
+        """Write a PhysioNet 2012 ``.txt`` file and return its path."""
+        file_path = path / "{}.txt".format(record_id)
+        file_path.write_text(
+            "Time,Parameter,Value\n"
+            + "".join("{},{},{}\n".format(*row) for row in rows)
+        )
+        return file_path
+
+    def test_process_files(self, tmp_path):
+        """Test static variables and ICUType are taken from time 00:00."""
+        files = [
+            self._write_patient(
+                tmp_path,
+                1,
+                [
+                    ("00:00", "RecordID", 1),
+                    ("00:00", "Age", 54),
+                    ("00:00", "Gender", 0),
+                    ("00:00", "Height", -1),
+                    ("00:00", "ICUType", 2),
+                    ("00:00", "Weight", -1),
+                    ("00:07", "HR", 73),
+                    ("01:30", "HR", 77),
+                ],
+            )
+        ]
+        X, length = PhysioNet2012._process_files(files, PHYSIONET_2012_VARS)
+        icu_type = [PHYSIONET_2012_VARS.index("ICUType" + str(j + 1)) for j in range(4)]
+        assert length == [3]
+        assert np.all(X[0, :, PHYSIONET_2012_VARS.index("Age")] == 54)
+        assert np.all(X[0][:, icu_type] == [0, 1, 0, 0])
+
+    def test_missing_time_0(self, tmp_path):
+        """Catch a patient without a time 00:00 row."""
+        files = [
+            self._write_patient(
+                tmp_path, 1, [("00:07", "HR", 73), ("00:07", "ICUType", 2)]
+            )
+        ]
+        with pytest.raises(
+            AssertionError,
+            match=re.escape("corrupt file, time 00:00 missing for a patient"),
+        ):
+            PhysioNet2012._process_files(files, PHYSIONET_2012_VARS)
+
+    def test_missing_icu_type(self, tmp_path):
+        """Catch a patient without an ICUType at time 00:00."""
+        files = [
+            self._write_patient(
+                tmp_path, 1, [("00:00", "Age", 54), ("00:00", "ICUType", 2)]
+            ),
+            self._write_patient(
+                tmp_path, 2, [("00:00", "Age", 60), ("00:07", "ICUType", 2)]
+            ),
+        ]
+        with pytest.raises(
+            AssertionError,
+            match=re.escape(
+                "corrupt file, ICUType missing at time 00:00 for a patient"
+            ),
+        ):
+            PhysioNet2012._process_files(files, PHYSIONET_2012_VARS)
+
+    def test_get_labels(self, tmp_path):
+        """Test labels are matched to patients by RecordID."""
+        outcome_file = tmp_path / "Outcomes-a.txt"
+        outcome_file.write_text("RecordID,In-hospital_death\n1,0\n2,1\n3,0\n")
+        data_files = [tmp_path / "3.txt", tmp_path / "2.txt"]
+        y = PhysioNet2012._get_labels([outcome_file], [data_files])
+        assert torch.equal(y, torch.tensor([[0], [1]], dtype=torch.int8))
+
+    def test_missing_outcome(self, tmp_path):
+        """Catch a patient without an outcome."""
+        outcome_file = tmp_path / "Outcomes-a.txt"
+        outcome_file.write_text("RecordID,In-hospital_death\n1,0\n2,1\n")
+        data_files = [tmp_path / "1.txt", tmp_path / "3.txt"]
+        with pytest.raises(
+            AssertionError,
+            match=re.escape("corrupt file, outcome missing for a patient"),
+        ):
+            PhysioNet2012._get_labels([outcome_file], [data_files])
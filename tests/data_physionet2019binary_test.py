@@ -5,7 +5,8 @@ import torch
 
 from torchtime.constants import OBJ_EXT
 from torchtime.data import PhysioNet2019Binary
-from torchtime.utils import _get_SHA256
+
+pytestmark = pytest.mark.xdist_group(name="physionet_2019")
 
 SEED = 456789
 RTOL = 1e-4
@@ -67,7 +68,7 @@ class TestPhysioNet2019Binary:
                 seed=SEED,
             )
 
-    def test_load_data(self):
+    def test_load_data(self, get_SHA256):
         """Validate data set."""
         PhysioNet2019Binary(
             split="train",
@@ -76,15 +77,15 @@ class TestPhysioNet2019Binary:
         )
         if CHECKSUM_X:
             assert (
-                _get_SHA256(".torchtime/physionet_2019binary/X" + OBJ_EXT) == CHECKSUM_X
+                get_SHA256(".torchtime/physionet_2019binary/X" + OBJ_EXT) == CHECKSUM_X
             )
         if CHECKSUM_Y:
             assert (
-                _get_SHA256(".torchtime/physionet_2019binary/y" + OBJ_EXT) == CHECKSUM_Y
+                get_SHA256(".torchtime/physionet_2019binary/y" + OBJ_EXT) == CHECKSUM_Y
             )
         if CHECKSUM_LENGTH:
             assert (
-                _get_SHA256(".torchtime/physionet_2019binary/length" + OBJ_EXT)
+                get_SHA256(".torchtime/physionet_2019binary/length" + OBJ_EXT)
                 == CHECKSUM_LENGTH
             )
 
@@ -149,9 +150,9 @@ class TestPhysioNet2019Binary:
             seed=SEED,
         )
         # Check correct split is returned
-        assert torch.allclose(dataset.X, dataset.X_train, equal_nan=True)
-        assert torch.allclose(dataset.y, dataset.y_train, equal_nan=True)
-        assert torch.allclose(dataset.length, dataset.length_train, equal_nan=True)
+        assert dataset.X is dataset.X_train
+        assert dataset.y is dataset.y_train
+        assert dataset.length is dataset.length_train
 
     def test_val_split(self):
         """Test validation split is returned."""
@@ -162,9 +163,9 @@ class TestPhysioNet2019Binary:
             seed=SEED,
         )
         # Check correct split is returned
-        assert torch.allclose(dataset.X, dataset.X_val, equal_nan=True)
-        assert torch.allclose(dataset.y, dataset.y_val, equal_nan=True)
-        assert torch.allclose(dataset.length, dataset.length_val, equal_nan=True)
+        assert dataset.X is dataset.X_val
+        assert dataset.y is dataset.y_val
+        assert dataset.length is dataset.length_val
 
     def test_test_split(self):
         """Test test split is returned."""
@@ -175,9 +176,9 @@ class TestPhysioNet2019Binary:
             seed=SEED,
         )
         # Check correct split is returned
-        assert torch.allclose(dataset.X, dataset.X_test, equal_nan=True)
-        assert torch.allclose(dataset.y, dataset.y_test, equal_nan=True)
-        assert torch.allclose(dataset.length, dataset.length_test, equal_nan=True)
+        assert dataset.X is dataset.X_test
+        assert dataset.y is dataset.y_test
+        assert dataset.length is dataset.length_test
 
     def test_length(self):
         """Test length attribute."""
@@ -188,18 +189,15 @@ class TestPhysioNet2019Binary:
             time=False,
             seed=SEED,
         )
-        for i, Xi in enumerate(dataset.X_train.unbind()):
-            length_i = dataset.length_train[i]
-            assert not torch.all(torch.isnan(Xi[length_i - 1]))
-            assert torch.all(torch.isnan(Xi[length_i:]))
-        for i, Xi in enumerate(dataset.X_val.unbind()):
-            length_i = dataset.length_val[i]
-            assert not torch.all(torch.isnan(Xi[length_i - 1]))
-            assert torch.all(torch.isnan(Xi[length_i:]))
-        for i, Xi in enumerate(dataset.X_test.unbind()):
-            length_i = dataset.length_test[i]
-            assert not torch.all(torch.isnan(Xi[length_i - 1]))
-            assert torch.all(torch.isnan(Xi[length_i:]))
+        for X, length in [
+            (dataset.X_train, dataset.length_train),
+            (dataset.X_val, dataset.length_val),
+            (dataset.X_test, dataset.length_test),
+        ]:
+            all_nan = torch.all(torch.isnan(X), dim=-1)  # shape (n, s)
+            padding = torch.arange(X.size(1)) >= length.unsqueeze(1)
+            assert not torch.any(all_nan[torch.arange(X.size(0)), length - 1])
+            assert torch.all(all_nan[padding])
 
     def test_invalid_impute(self):
         """Catch invalid impute arguments."""
@@ -245,30 +243,14 @@ class TestPhysioNet2019Binary:
         assert torch.sum(torch.isnan(dataset.X_test)).item() == 9858312
         assert torch.sum(torch.isnan(dataset.y_test)).item() == 0
 
-    def test_zero_impute(self):
-        """Test zero imputation."""
-        dataset = PhysioNet2019Binary(
-            split="train",
-            train_prop=0.7,
-            val_prop=0.2,
-            impute="zero",
-            seed=SEED,
-        )
-        # Check no NaNs post imputation
-        assert torch.sum(torch.isnan(dataset.X_train)).item() == 0
-        assert torch.sum(torch.isnan(dataset.y_train)).item() == 0
-        assert torch.sum(torch.isnan(dataset.X_val)).item() == 0
-        assert torch.sum(torch.isnan(dataset.y_val)).item() == 0
-        assert torch.sum(torch.isnan(dataset.X_test)).item() == 0
-        assert torch.sum(torch.isnan(dataset.y_test)).item() == 0
-
-    def test_mean_impute(self):
-        """Test mean imputation."""
+    @pytest.mark.parametrize("impute", ["zero", "mean", "forward"])
+    def test_impute(self, impute):
+        """Test zero, mean and forward imputation."""
         dataset = PhysioNet2019Binary(
             split="train",
             train_prop=0.7,
             val_prop=0.2,
-            impute="mean",
+            impute=impute,
             seed=SEED,
         )
         # Check no NaNs post imputation
@@ -279,29 +261,8 @@ class TestPhysioNet2019Binary:
         assert torch.sum(torch.isnan(dataset.X_test)).item() == 0
         assert torch.sum(torch.isnan(dataset.y_test)).item() == 0
 
-    def test_forward_impute(self):
-        """Test forward imputation."""
-        dataset = PhysioNet2019Binary(
-            split="train",
-            train_prop=0.7,
-            val_prop=0.2,
-            impute="forward",
-            seed=SEED,
-        )
-        # Check no NaNs post imputation
-        assert torch.sum(torch.isnan(dataset.X_train)).item() == 0
-        assert torch.sum(torch.isnan(dataset.y_train)).item() == 0
-        assert torch.sum(torch.isnan(dataset.X_val)).item() == 0
-        assert torch.sum(torch.isnan(dataset.y_val)).item() == 0
-        assert torch.sum(torch.isnan(dataset.X_test)).item() == 0
-        assert torch.sum(torch.isnan(dataset.y_test)).item() == 0
-
-    def test_custom_imputation_1(self):
+    def test_custom_imputation_1(self, impute_with_zero):
         """Test custom imputation function."""
-
-        def impute_with_zero(X, y, fill, select):
-            return X.nan_to_num(0), y.nan_to_num(0)
-
         dataset = PhysioNet2019Binary(
             split="train",
             train_prop=0.7,
@@ -317,12 +278,8 @@ class TestPhysioNet2019Binary:
         assert torch.sum(torch.isnan(dataset.X_test)).item() == 0
         assert torch.sum(torch.isnan(dataset.y_test)).item() == 0
 
-    def test_custom_imputation_2(self):
+    def test_custom_imputation_2(self, no_imputation):
         """Test custom imputation function."""
-
-        def no_imputation(X, y, fill, select):
-            return X, y
-
         dataset = PhysioNet2019Binary(
             split="train",
             train_prop=0.7,
@@ -338,7 +295,7 @@ class TestPhysioNet2019Binary:
         assert torch.sum(torch.isnan(dataset.X_test)).item() == 9858312
         assert torch.sum(torch.isnan(dataset.y_test)).item() == 0
 
-    def test_overwrite_data(self):
+    def test_overwrite_data(self, get_SHA256):
         """Overwrite cache and validate data set."""
         PhysioNet2019Binary(
             split="train",
@@ -348,15 +305,15 @@ class TestPhysioNet2019Binary:
         )
         if CHECKSUM_X:
             assert (
-                _get_SHA256(".torchtime/physionet_2019binary/X" + OBJ_EXT) == CHECKSUM_X
+                get_SHA256(".torchtime/physionet_2019binary/X" + OBJ_EXT) == CHECKSUM_X
             )
         if CHECKSUM_Y:
             assert (
-                _get_SHA256(".torchtime/physionet_2019binary/y" + OBJ_EXT) == CHECKSUM_Y
+                get_SHA256(".torchtime/physionet_2019binary/y" + OBJ_EXT) == CHECKSUM_Y
             )
         if CHECKSUM_LENGTH:
             assert (
-                _get_SHA256(".torchtime/physionet_2019binary/length" + OBJ_EXT)
+                get_SHA256(".torchtime/physionet_2019binary/length" + OBJ_EXT)
                 == CHECKSUM_LENGTH
             )
 
@@ -374,19 +331,9 @@ class TestPhysioNet2019Binary:
         assert dataset.X_val.shape == torch.Size([8066, 72, 41])
         assert dataset.X_test.shape == torch.Size([4033, 72, 41])
         # Check time channel
-        for i in range(72):
-            assert torch.equal(
-                dataset.X_train[:, i, 0],
-                torch.full([28234], fill_value=i, dtype=torch.float),
-            )
-            assert torch.equal(
-                dataset.X_val[:, i, 0],
-                torch.full([8066], fill_value=i, dtype=torch.float),
-            )
-            assert torch.equal(
-                dataset.X_test[:, i, 0],
-                torch.full([4033], fill_value=i, dtype=torch.float),
-            )
+        time_stamp = torch.arange(72, dtype=torch.float)
+        for X in [dataset.X_train, dataset.X_val, dataset.X_test]:
+            assert torch.equal(X[:, :, 0], time_stamp.expand(X.size(0), -1))
 
     def test_no_time(self):
         """Test time argument."""
@@ -457,19 +404,9 @@ class TestPhysioNet2019Binary:
         assert dataset.X_val.shape == torch.Size([8066, 72, 121])
         assert dataset.X_test.shape == torch.Size([4033, 72, 121])
         # Check time channel
-        for i in range(72):
-            assert torch.equal(
-                dataset.X_train[:, i, 0],
-                torch.full([28234], fill_value=i, dtype=torch.float),
-            )
-            assert torch.equal(
-                dataset.X_val[:, i, 0],
-                torch.full([8066], fill_value=i, dtype=torch.float),
-            )
-            assert torch.equal(
-                dataset.X_test[:, i, 0],
-                torch.full([4033], fill_value=i, dtype=torch.float),
-            )
+        time_stamp = torch.arange(72, dtype=torch.float)
+        for X in [dataset.X_train, dataset.X_val, dataset.X_test]:
+            assert torch.equal(X[:, :, 0], time_stamp.expand(X.size(0), -1))
         # Check time delta channel
         assert torch.equal(
             dataset.X_train[:, 0, 81], torch.zeros([28234], dtype=torch.float)
@@ -490,16 +427,14 @@ class TestPhysioNet2019Binary:
             standardise=True,
             seed=SEED,
         )
-        for c, Xc in enumerate(dataset.X_train.unbind(dim=-1)):
-            assert torch.allclose(
-                torch.nanmean(Xc), torch.Tensor([0.0]), rtol=RTOL, atol=ATOL
-            )
-            assert torch.allclose(
-                torch.std(Xc[~torch.isnan(Xc)]),
-                torch.Tensor([1.0]),
-                rtol=RTOL,
-                atol=ATOL,
-            )
+        X = dataset.X_train
+        observed = ~torch.isnan(X)
+        means = torch.nanmean(X, dim=(0, 1))
+        stds = torch.sqrt(
+            torch.nansum((X - means) ** 2, dim=(0, 1)) / (observed.sum(dim=(0, 1)) - 1)
+        )
+        assert torch.allclose(means, torch.zeros_like(means), rtol=RTOL, atol=ATOL)
+        assert torch.allclose(stds, torch.ones_like(stds), rtol=RTOL, atol=ATOL)
 
     def test_reproducibility_1(self):
         """Test seed argument."""
@@ -510,15 +445,15 @@ class TestPhysioNet2019Binary:
             seed=SEED,
         )
         # Check first value in 39th channel
-        assert torch.allclose(
-            dataset.X_train[0, 0, 39], torch.tensor(-0.03), rtol=RTOL, atol=ATOL
-        )
-        assert torch.allclose(
-            dataset.X_val[0, 0, 39], torch.tensor(-27.55), rtol=RTOL, atol=ATOL
-        )
-        assert torch.allclose(
-            dataset.X_test[0, 0, 39], torch.tensor(-0.66), rtol=RTOL, atol=ATOL
+        actual = torch.stack(
+            [
+                dataset.X_train[0, 0, 39],
+                dataset.X_val[0, 0, 39],
+                dataset.X_test[0, 0, 39],
+            ]
         )
+        expected = torch.tensor([-0.03, -27.55, -0.66])
+        assert torch.allclose(actual, expected, rtol=RTOL, atol=ATOL)
 
     def test_reproducibility_2(self):
         """Test seed argument."""
@@ -529,12 +464,12 @@ class TestPhysioNet2019Binary:
             seed=999999,
         )
         # Check first value in 39th channel
-        assert torch.allclose(
-            dataset.X_train[0, 0, 39], torch.tensor(-0.01), rtol=RTOL, atol=ATOL
-        )
-        assert torch.allclose(
-            dataset.X_val[0, 0, 39], torch.tensor(-90.73), rtol=RTOL, atol=ATOL
-        )
-        assert torch.allclose(
-            dataset.X_test[0, 0, 39], torch.tensor(-199.47), rtol=RTOL, atol=ATOL
-        )
+        actual = torch.stack(
+            [
+                dataset.X_train[0, 0, 39],
+                dataset.X_val[0, 0, 39],
+                dataset.X_test[0, 0, 39],
+            ]
+        )
+        expected = torch.tensor([-0.01, -90.73, -199.47])
+        assert torch.allclose(actual, expected, rtol=RTOL, atol=ATOL)
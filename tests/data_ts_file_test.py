@@ -0,0 +1,112 @@
+import numpy as np
+import pytest
+import torch
+from sktime.datasets import load_from_tsfile_to_dataframe
+
+from torchtime.data import UEA, _load_ts_file, _parse_ts_file
+
+TS_HEADER = """# Example data set
+# with comments before the header
+@problemName Example
+@timeStamps {}
+@missing true
+@univariate false
+@dimensions 2
+@equalLength false
+@classLabel {}
+@data
+"""
+TS_DATA = """1.0,2.0,3.0:4.5,?,6.25:a
+
+?,8.0:9.0,10.0,11.0,12.0:b
+-1.5,0.0,2.5,?,4.0:1e-3,2E2:a
+"""
+TS_TIME_STAMPS_DATA = """(0,1.0),(1,2.0),(2,3.0):(0,4.5),(1,5.5),(2,6.25):a
+(0,7.0),(1,8.0):(0,9.0),(1,10.0):b
+"""
+
+
+def _write_ts_file(path, time_stamps, labels, data):
+    """Write a ``.ts`` file and return its path."""
+    file_path = path / "example.ts"
+    file_path.write_text(
+        TS_HEADER.format(
+            "true" if time_stamps else "false", "true a b" if labels else "false"
+        )
+        + data
+    )
+    return str(file_path)
+
+
+def _assert_equal_sktime(X, y, file_path):
+    """Check ``X`` and ``y`` match ``load_from_tsfile_to_dataframe()``."""
+    X_expect, y_expect = load_from_tsfile_to_dataframe(file_path)
+    assert len(X) == X_expect.shape[0]
+    for Xi, Xi_expect in zip(X, X_expect.to_numpy()):
+        assert len(Xi) == len(Xi_expect)
+        for Xij, Xij_expect in zip(Xi, Xi_expect):
+            assert Xij.dtype == np.float32
+            np.testing.assert_array_equal(Xij, Xij_expect.to_numpy(dtype=np.float32))
+    np.testing.assert_array_equal(y, y_expect)
+
+
+class TestTsFile:
+    """Test parsing of UEA ``.ts`` files."""
+
+    def test_parse_ts_file(self, tmp_path):
+        """Test ragged series, missing values, comments and labels."""
+        file_path = _write_ts_file(tmp_path, False, True, TS_DATA)
+        X, y = _parse_ts_file(file_path)
+        _assert_equal_sktime(X, y, file_path)
+        # Ragged series and missing values
+        assert [[Xij.size for Xij in Xi] for Xi in X] == [[3, 3], [2, 4], [5, 2]]
+        assert np.isnan(X[0][1][1]) and np.isnan(X[1][0][0])
+        assert np.isnan(X[2][0][3])
+        np.testing.assert_array_equal(y, ["a", "b", "a"])
+        # Comments in the data section are ignored (not supported by sktime)
+        comment_path = tmp_path / "comment"
+        comment_path.mkdir()
+        X, y = _parse_ts_file(
+            _write_ts_file(comment_path, False, True, "# comment\n" + TS_DATA)
+        )
+        _assert_equal_sktime(X, y, file_path)
+
+    def test_parse_ts_file_time_stamps(self, tmp_path):
+        """Catch files with time stamps."""
+        file_path = _write_ts_file(tmp_path, True, True, TS_TIME_STAMPS_DATA)
+        with pytest.raises(ValueError, match="time stamps are not supported"):
+            _parse_ts_file(file_path)
+
+    def test_parse_ts_file_no_labels(self, tmp_path):
+        """Catch files without class labels."""
+        data = "".join(line.rsplit(":", 1)[0] + "\n" for line in TS_DATA.splitlines())
+        file_path = _write_ts_file(tmp_path, False, False, data)
+        with pytest.raises(ValueError, match="class labels are required"):
+            _parse_ts_file(file_path)
+
+    def test_load_ts_file(self, tmp_path):
+        """Test files without time stamps are parsed directly."""
+        file_path = _write_ts_file(tmp_path, False, True, TS_DATA)
+        X, y = _load_ts_file(file_path)
+        _assert_equal_sktime(X, y, file_path)
+
+    def test_load_ts_file_fallback(self, tmp_path):
+        """Test files with time stamps are loaded using sktime."""
+        file_path = _write_ts_file(tmp_path, True, True, TS_TIME_STAMPS_DATA)
+        X, y = _load_ts_file(file_path)
+        _assert_equal_sktime(X, y, file_path)
+        assert [[Xij.size for Xij in Xi] for Xi in X] == [[3, 3], [2, 2]]
+
+    def test_pad_ts_data(self, tmp_path):
+        """Test trajectories and shorter channels are padded with NaNs."""
+        X_raw, _ = _parse_ts_file(_write_ts_file(tmp_path, False, True, TS_DATA))
+        X, length = UEA._pad_ts_data(X_raw)
+        assert X.shape == torch.Size([3, 5, 2]) and X.dtype == torch.float32
+        assert torch.equal(length, torch.tensor([3, 4, 5]))
+        for Xi, Xi_raw in zip(X, X_raw):
+            for Xij, Xij_raw in zip(Xi.T, Xi_raw):
+                assert torch.equal(
+                    Xij[: Xij_raw.size].nan_to_num(-99),
+                    torch.from_numpy(Xij_raw).nan_to_num(-99),
+                )
+                assert torch.all(torch.isnan(Xij[Xij_raw.size :]))
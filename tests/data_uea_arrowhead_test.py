@@ -1,11 +1,15 @@
+import os
+import pathlib
 import re
 
 import pytest
 import torch
 
-from torchtime.constants import OBJ_EXT
+from torchtime.constants import OBJ_EXT, STRATIFY_OBJ
 from torchtime.data import UEA
-from torchtime.utils import _get_SHA256
+from torchtime.utils import _cache_data, _get_manifest, _load_cache
+
+pytestmark = pytest.mark.xdist_group(name="uea_ArrowHead")
 
 DATASET = "ArrowHead"
 SEED = 456789
@@ -72,7 +76,7 @@ class TestUEAArrowHead:
                 seed=SEED,
             )
 
-    def test_load_data(self):
+    def test_load_data(self, get_SHA256):
         """Validate data set."""
         UEA(
             dataset=DATASET,
@@ -82,15 +86,15 @@ class TestUEAArrowHead:
         )
         if CHECKSUM_X:
             assert (
-                _get_SHA256(".torchtime/uea_" + DATASET + "/X" + OBJ_EXT) == CHECKSUM_X
+                get_SHA256(".torchtime/uea_" + DATASET + "/X" + OBJ_EXT) == CHECKSUM_X
             )
         if CHECKSUM_Y:
             assert (
-                _get_SHA256(".torchtime/uea_" + DATASET + "/y" + OBJ_EXT) == CHECKSUM_Y
+                get_SHA256(".torchtime/uea_" + DATASET + "/y" + OBJ_EXT) == CHECKSUM_Y
             )
         if CHECKSUM_LENGTH:
             assert (
-                _get_SHA256(".torchtime/uea_" + DATASET + "/length" + OBJ_EXT)
+                get_SHA256(".torchtime/uea_" + DATASET + "/length" + OBJ_EXT)
                 == CHECKSUM_LENGTH
             )
 
@@ -124,15 +128,8 @@ class TestUEAArrowHead:
         ):
             dataset.length_test
 
-    def test_train_val_test(self):
+    def test_train_val_test(self, dataset):
         """Test training/validation/test split sizes."""
-        dataset = UEA(
-            dataset=DATASET,
-            split="train",
-            train_prop=0.7,
-            val_prop=0.2,
-            seed=SEED,
-        )
         # Check data set size
         assert dataset.X_train.shape == torch.Size([148, 251, 2])
         assert dataset.y_train.shape == torch.Size([148, 3])
@@ -144,19 +141,12 @@ class TestUEAArrowHead:
         assert dataset.y_test.shape == torch.Size([21, 3])
         assert dataset.length_test.shape == torch.Size([21])
 
-    def test_train_split(self):
+    def test_train_split(self, dataset):
         """Test training split is returned."""
-        dataset = UEA(
-            dataset=DATASET,
-            split="train",
-            train_prop=0.7,
-            val_prop=0.2,
-            seed=SEED,
-        )
         # Check correct split is returned
-        assert torch.allclose(dataset.X, dataset.X_train)
-        assert torch.allclose(dataset.y, dataset.y_train)
-        assert torch.allclose(dataset.length, dataset.length_train)
+        assert dataset.X is dataset.X_train
+        assert dataset.y is dataset.y_train
+        assert dataset.length is dataset.length_train
 
     def test_val_split(self):
         """Test validation split is returned."""
@@ -168,9 +158,9 @@ class TestUEAArrowHead:
             seed=SEED,
         )
         # Check correct split is returned
-        assert torch.allclose(dataset.X, dataset.X_val)
-        assert torch.allclose(dataset.y, dataset.y_val)
-        assert torch.allclose(dataset.length, dataset.length_val)
+        assert dataset.X is dataset.X_val
+        assert dataset.y is dataset.y_val
+        assert dataset.length is dataset.length_val
 
     def test_test_split(self):
         """Test test split is returned."""
@@ -182,9 +172,9 @@ class TestUEAArrowHead:
             seed=SEED,
         )
         # Check correct split is returned
-        assert torch.allclose(dataset.X, dataset.X_test)
-        assert torch.allclose(dataset.y, dataset.y_test)
-        assert torch.allclose(dataset.length, dataset.length_test)
+        assert dataset.X is dataset.X_test
+        assert dataset.y is dataset.y_test
+        assert dataset.length is dataset.length_test
 
     def test_length(self):
         """Test length attribute."""
@@ -203,25 +193,17 @@ class TestUEAArrowHead:
         assert torch.all(dataset.length_test == dataset.length_test[0])
         assert dataset.X_test.size(1) == dataset.length_test[0]
 
-    def test_missing(self):
+    def test_missing(self, dataset_missing):
         """Test missing data simulation."""
-        dataset = UEA(
-            dataset=DATASET,
-            split="train",
-            train_prop=0.7,
-            val_prop=0.2,
-            missing=0.5,
-            seed=SEED,
-        )
         # Check number of NaNs
         assert (
-            torch.sum(torch.isnan(dataset.X_train)).item() == 18500
+            torch.sum(torch.isnan(dataset_missing.X_train)).item() == 18500
         )  # expect around 148 * 251 * 0.5 = 18,574
         assert (
-            torch.sum(torch.isnan(dataset.X_val)).item() == 5250
+            torch.sum(torch.isnan(dataset_missing.X_val)).item() == 5250
         )  # expect around 42 * 251 * 0.5 = 5,271
         assert (
-            torch.sum(torch.isnan(dataset.X_test)).item() == 2625
+            torch.sum(torch.isnan(dataset_missing.X_test)).item() == 2625
         )  # expect around 21 * 251 * 0.5 = 2,535
 
     def test_invalid_impute(self):
@@ -255,53 +237,26 @@ class TestUEAArrowHead:
                 seed=SEED,
             )
 
-    def test_no_impute(self):
+    def test_no_impute(self, dataset_missing):
         """Test no imputation."""
-        dataset = UEA(
-            dataset=DATASET,
-            split="train",
-            train_prop=0.7,
-            val_prop=0.2,
-            missing=0.5,
-            impute="none",
-            seed=SEED,
-        )
         # Check number of NaNs
-        assert torch.sum(torch.isnan(dataset.X_train)).item() == 18500
-        assert torch.sum(torch.isnan(dataset.y_train)).item() == 0
-        assert torch.sum(torch.isnan(dataset.X_val)).item() == 5250
-        assert torch.sum(torch.isnan(dataset.y_val)).item() == 0
-        assert torch.sum(torch.isnan(dataset.X_test)).item() == 2625
-        assert torch.sum(torch.isnan(dataset.y_test)).item() == 0
-
-    def test_zero_impute(self):
-        """Test zero imputation."""
-        dataset = UEA(
-            dataset=DATASET,
-            split="train",
-            train_prop=0.7,
-            val_prop=0.2,
-            missing=0.5,
-            impute="zero",
-            seed=SEED,
-        )
-        # Check no NaNs post imputation
-        assert torch.sum(torch.isnan(dataset.X_train)).item() == 0
-        assert torch.sum(torch.isnan(dataset.y_train)).item() == 0
-        assert torch.sum(torch.isnan(dataset.X_val)).item() == 0
-        assert torch.sum(torch.isnan(dataset.y_val)).item() == 0
-        assert torch.sum(torch.isnan(dataset.X_test)).item() == 0
-        assert torch.sum(torch.isnan(dataset.y_test)).item() == 0
-
-    def test_mean_impute(self):
-        """Test mean imputation."""
+        assert torch.sum(torch.isnan(dataset_missing.X_train)).item() == 18500
+        assert torch.sum(torch.isnan(dataset_missing.y_train)).item() == 0
+        assert torch.sum(torch.isnan(dataset_missing.X_val)).item() == 5250
+        assert torch.sum(torch.isnan(dataset_missing.y_val)).item() == 0
+        assert torch.sum(torch.isnan(dataset_missing.X_test)).item() == 2625
+        assert torch.sum(torch.isnan(dataset_missing.y_test)).item() == 0
+
+    @pytest.mark.parametrize("impute", ["zero", "mean", "forward"])
+    def test_impute(self, impute):
+        """Test zero, mean and forward imputation."""
         dataset = UEA(
             dataset=DATASET,
             split="train",
             train_prop=0.7,
             val_prop=0.2,
             missing=0.5,
-            impute="mean",
+            impute=impute,
             seed=SEED,
         )
         # Check no NaNs post imputation
@@ -312,31 +267,8 @@ class TestUEAArrowHead:
         assert torch.sum(torch.isnan(dataset.X_test)).item() == 0
         assert torch.sum(torch.isnan(dataset.y_test)).item() == 0
 
-    def test_forward_impute(self):
-        """Test forward imputation."""
-        dataset = UEA(
-            dataset=DATASET,
-            split="train",
-            train_prop=0.7,
-            val_prop=0.2,
-            missing=0.5,
-            impute="forward",
-            seed=SEED,
-        )
-        # Check no NaNs post imputation
-        assert torch.sum(torch.isnan(dataset.X_train)).item() == 0
-        assert torch.sum(torch.isnan(dataset.y_train)).item() == 0
-        assert torch.sum(torch.isnan(dataset.X_val)).item() == 0
-        assert torch.sum(torch.isnan(dataset.y_val)).item() == 0
-        assert torch.sum(torch.isnan(dataset.X_test)).item() == 0
-        assert torch.sum(torch.isnan(dataset.y_test)).item() == 0
-
-    def test_custom_imputation_1(self):
+    def test_custom_imputation_1(self, impute_with_zero):
         """Test custom imputation function."""
-
-        def impute_with_zero(X, y, fill, select):
-            return X.nan_to_num(0), y.nan_to_num(0)
-
         dataset = UEA(
             dataset=DATASET,
             split="train",
@@ -354,12 +286,8 @@ class TestUEAArrowHead:
         assert torch.sum(torch.isnan(dataset.X_test)).item() == 0
         assert torch.sum(torch.isnan(dataset.y_test)).item() == 0
 
-    def test_custom_imputation_2(self):
+    def test_custom_imputation_2(self, no_imputation):
         """Test custom imputation function."""
-
-        def no_imputation(X, y, fill, select):
-            return X, y
-
         dataset = UEA(
             dataset=DATASET,
             split="train",
@@ -377,7 +305,7 @@ class TestUEAArrowHead:
         assert torch.sum(torch.isnan(dataset.X_test)).item() == 2625
         assert torch.sum(torch.isnan(dataset.y_test)).item() == 0
 
-    def test_overwrite_data(self):
+    def test_overwrite_data(self, get_SHA256):
         """Overwrite cache and validate data set."""
         UEA(
             dataset=DATASET,
@@ -388,46 +316,28 @@ class TestUEAArrowHead:
         )
         if CHECKSUM_X:
             assert (
-                _get_SHA256(".torchtime/uea_" + DATASET + "/X" + OBJ_EXT) == CHECKSUM_X
+                get_SHA256(".torchtime/uea_" + DATASET + "/X" + OBJ_EXT) == CHECKSUM_X
             )
         if CHECKSUM_Y:
             assert (
-                _get_SHA256(".torchtime/uea_" + DATASET + "/y" + OBJ_EXT) == CHECKSUM_Y
+                get_SHA256(".torchtime/uea_" + DATASET + "/y" + OBJ_EXT) == CHECKSUM_Y
             )
         if CHECKSUM_LENGTH:
             assert (
-                _get_SHA256(".torchtime/uea_" + DATASET + "/length" + OBJ_EXT)
+                get_SHA256(".torchtime/uea_" + DATASET + "/length" + OBJ_EXT)
                 == CHECKSUM_LENGTH
             )
 
-    def test_time(self):
+    def test_time(self, dataset):
         """Test time argument."""
-        dataset = UEA(
-            dataset=DATASET,
-            split="train",
-            train_prop=0.7,
-            val_prop=0.2,
-            time=True,
-            seed=SEED,
-        )
         # Check data set size
         assert dataset.X_train.shape == torch.Size([148, 251, 2])
         assert dataset.X_val.shape == torch.Size([42, 251, 2])
         assert dataset.X_test.shape == torch.Size([21, 251, 2])
         # Check time channel
-        for i in range(251):
-            assert torch.equal(
-                dataset.X_train[:, i, 0],
-                torch.full([148], fill_value=i, dtype=torch.float),
-            )
-            assert torch.equal(
-                dataset.X_val[:, i, 0],
-                torch.full([42], fill_value=i, dtype=torch.float),
-            )
-            assert torch.equal(
-                dataset.X_test[:, i, 0],
-                torch.full([21], fill_value=i, dtype=torch.float),
-            )
+        time_stamp = torch.arange(251, dtype=torch.float)
+        for X in [dataset.X_train, dataset.X_val, dataset.X_test]:
+            assert torch.equal(X[:, :, 0], time_stamp.expand(X.size(0), -1))
 
     def test_no_time(self):
         """Test time argument."""
@@ -487,19 +397,8 @@ class TestUEAArrowHead:
         assert torch.equal(
             dataset.X_test[:, 0, 1], torch.zeros([21], dtype=torch.float)
         )
-        for i in range(1, 251):
-            assert torch.equal(
-                dataset.X_train[:, i, 1],
-                torch.full([148], fill_value=1, dtype=torch.float),
-            )
-            assert torch.equal(
-                dataset.X_val[:, i, 1],
-                torch.full([42], fill_value=1, dtype=torch.float),
-            )
-            assert torch.equal(
-                dataset.X_test[:, i, 1],
-                torch.full([21], fill_value=1, dtype=torch.float),
-            )
+        for X in [dataset.X_train, dataset.X_val, dataset.X_test]:
+            assert torch.all(X[:, 1:251, 1] == 1)
 
     def test_time_mask_delta(self):
         """Test combination of time/mask/delta arguments."""
@@ -517,19 +416,9 @@ class TestUEAArrowHead:
         assert dataset.X_val.shape == torch.Size([42, 251, 4])
         assert dataset.X_test.shape == torch.Size([21, 251, 4])
         # Check time channel
-        for i in range(251):
-            assert torch.equal(
-                dataset.X_train[:, i, 0],
-                torch.full([148], fill_value=i, dtype=torch.float),
-            )
-            assert torch.equal(
-                dataset.X_val[:, i, 0],
-                torch.full([42], fill_value=i, dtype=torch.float),
-            )
-            assert torch.equal(
-                dataset.X_test[:, i, 0],
-                torch.full([21], fill_value=i, dtype=torch.float),
-            )
+        time_stamp = torch.arange(251, dtype=torch.float)
+        for X in [dataset.X_train, dataset.X_val, dataset.X_test]:
+            assert torch.equal(X[:, :, 0], time_stamp.expand(X.size(0), -1))
         # Check mask channel
         assert torch.sum(dataset.X_train[:, :, 2]) == 148 * 251
         assert torch.sum(dataset.X_val[:, :, 2]) == 42 * 251
@@ -542,19 +431,8 @@ class TestUEAArrowHead:
         assert torch.equal(
             dataset.X_test[:, 0, 3], torch.zeros([21], dtype=torch.float)
         )
-        for i in range(1, 251):
-            assert torch.equal(
-                dataset.X_train[:, i, 3],
-                torch.full([148], fill_value=1, dtype=torch.float),
-            )
-            assert torch.equal(
-                dataset.X_val[:, i, 3],
-                torch.full([42], fill_value=1, dtype=torch.float),
-            )
-            assert torch.equal(
-                dataset.X_test[:, i, 3],
-                torch.full([21], fill_value=1, dtype=torch.float),
-            )
+        for X in [dataset.X_train, dataset.X_val, dataset.X_test]:
+            assert torch.all(X[:, 1:251, 3] == 1)
 
     def test_standarisation(self):
         """Check training data is standardised."""
@@ -566,36 +444,48 @@ class TestUEAArrowHead:
             standardise=True,
             seed=SEED,
         )
-        for c, Xc in enumerate(dataset.X_train.unbind(dim=-1)):
-            assert torch.allclose(
-                torch.nanmean(Xc), torch.Tensor([0.0]), rtol=RTOL, atol=ATOL
-            )
-            assert torch.allclose(
-                torch.std(Xc[~torch.isnan(Xc)]),
-                torch.Tensor([1.0]),
-                rtol=RTOL,
-                atol=ATOL,
-            )
+        X = dataset.X_train
+        observed = ~torch.isnan(X)
+        means = torch.nanmean(X, dim=(0, 1))
+        stds = torch.sqrt(
+            torch.nansum((X - means) ** 2, dim=(0, 1)) / (observed.sum(dim=(0, 1)) - 1)
+        )
+        assert torch.allclose(means, torch.zeros_like(means), rtol=RTOL, atol=ATOL)
+        assert torch.allclose(stds, torch.ones_like(stds), rtol=RTOL, atol=ATOL)
 
-    def test_reproducibility_1(self):
-        """Test seed argument."""
+    def test_transform(self):
+        """Test transform() method reproduces the standardised/imputed splits."""
         dataset = UEA(
             dataset=DATASET,
             split="train",
             train_prop=0.7,
             val_prop=0.2,
+            missing=0.5,
+            impute="mean",
+            standardise=True,
             seed=SEED,
         )
-        # Check first value in each data set
-        assert torch.allclose(
-            dataset.X_train[0, 0, 1], torch.tensor(-1.8515), rtol=RTOL, atol=ATOL
-        )
-        assert torch.allclose(
-            dataset.X_val[0, 0, 1], torch.tensor(-1.9190), rtol=RTOL, atol=ATOL
+        raw_dataset = UEA(
+            dataset=DATASET,
+            split="val",
+            train_prop=0.7,
+            val_prop=0.2,
+            missing=0.5,
+            seed=SEED,
         )
-        assert torch.allclose(
-            dataset.X_test[0, 0, 1], torch.tensor(-1.8091), rtol=RTOL, atol=ATOL
+        X_val, y_val = dataset.transform(raw_dataset.X_val, raw_dataset.y_val)
+        assert torch.equal(X_val, dataset.X_val)
+        assert torch.equal(y_val, dataset.y_val)
+        assert torch.sum(torch.isnan(raw_dataset.X_val)).item() > 0
+
+    def test_reproducibility_1(self, dataset):
+        """Test seed argument."""
+        # Check first value in each data set
+        actual = torch.stack(
+            [dataset.X_train[0, 0, 1], dataset.X_val[0, 0, 1], dataset.X_test[0, 0, 1]]
         )
+        expected = torch.tensor([-1.8515, -1.9190, -1.8091])
+        assert torch.allclose(actual, expected, rtol=RTOL, atol=ATOL)
 
     def test_reproducibility_2(self):
         """Test seed argument."""
@@ -607,12 +497,96 @@ class TestUEAArrowHead:
             seed=999999,
         )
         # Check first value in each data set
-        assert torch.allclose(
-            dataset.X_train[0, 0, 1], torch.tensor(-1.7993), rtol=RTOL, atol=ATOL
+        actual = torch.stack(
+            [dataset.X_train[0, 0, 1], dataset.X_val[0, 0, 1], dataset.X_test[0, 0, 1]]
         )
-        assert torch.allclose(
-            dataset.X_val[0, 0, 1], torch.tensor(-2.1308), rtol=RTOL, atol=ATOL
+        expected = torch.tensor([-1.7993, -2.1308, -2.1468])
+        assert torch.allclose(actual, expected, rtol=RTOL, atol=ATOL)
+
+    def test_share_memory(self, dataset):
+        """Test share_memory argument."""
+        assert not any(t.is_shared() for t in [dataset.X, dataset.y, dataset.length])
+        dataset = UEA(
+            dataset=DATASET,
+            split="train",
+            train_prop=0.7,
+            val_prop=0.2,
+            share_memory=True,
+            seed=SEED,
+        )
+        assert all(t.is_shared() for t in [dataset.X, dataset.y, dataset.length])
+
+    def test_assign_split(self):
+        """Test data split attributes can be assigned to."""
+        dataset = UEA(
+            dataset=DATASET,
+            split="train",
+            train_prop=0.7,
+            seed=SEED,
+        )
+        X_val = torch.zeros_like(dataset.X_val)
+        dataset.X_val = X_val
+        assert dataset.X_val is X_val
+        assert dataset.y_val.size(0) == X_val.size(0)
+        dataset.X_test = X_val
+        assert dataset.X_test is X_val
+
+    def test_channels_cache(self):
+        """Test X with added channels is only cached if no missing data simulated."""
+        path = pathlib.Path(".torchtime/uea_" + DATASET)
+        dataset = UEA(
+            dataset=DATASET,
+            split="train",
+            train_prop=0.7,
+            mask=True,
+            seed=SEED,
+        )
+        manifest = _get_manifest(path)
+        assert {"time": True, "mask": True, "delta": False} in manifest.values()
+        missing_dataset = UEA(
+            dataset=DATASET,
+            split="train",
+            train_prop=0.7,
+            missing=0.5,
+            mask=True,
+            seed=SEED,
         )
-        assert torch.allclose(
-            dataset.X_test[0, 0, 1], torch.tensor(-2.1468), rtol=RTOL, atol=ATOL
+        assert _get_manifest(path) == manifest
+        # Missing data mask reflects simulated missing data
+        assert not torch.equal(dataset.X[:, :, 2], missing_dataset.X[:, :, 2])
+
+    def test_rebuild_cache(self, dataset):
+        """Test cached stratification labels are replaced when the data are rebuilt."""
+        path = pathlib.Path(".torchtime/uea_" + DATASET)
+        stale_stratify = torch.zeros(1, dtype=torch.bool)
+        _cache_data(path, stale_stratify, objs=[STRATIFY_OBJ])
+        os.remove(path / ("X" + OBJ_EXT))
+        rebuilt_dataset = UEA(
+            dataset=DATASET,
+            split="train",
+            train_prop=0.7,
+            val_prop=0.2,
+            seed=SEED,
+        )
+        assert not torch.equal(_load_cache(path, STRATIFY_OBJ), stale_stratify)
+        assert torch.equal(rebuilt_dataset.y_train, dataset.y_train)
+        assert torch.equal(rebuilt_dataset.length_val, dataset.length_val)
+
+    @pytest.mark.parametrize("dtype", [torch.bfloat16, torch.float64])
+    def test_dtype(self, dtype):
+        """Test dtype argument."""
+        dataset = UEA(
+            dataset=DATASET,
+            split="train",
+            train_prop=0.7,
+            val_prop=0.2,
+            delta=True,
+            dtype=dtype,
+            seed=SEED,
         )
+        time_stamp = torch.arange(251, dtype=dtype)
+        for X in [dataset.X_train, dataset.X_val, dataset.X_test]:
+            assert X.dtype == dtype
+            assert torch.equal(X[:, :, 0], time_stamp.expand(X.size(0), -1))
+            # No missing data so time delta is 1 after the first time point
+            assert torch.all(X[:, 1:, 2] == 1)
@@ -5,7 +5,8 @@ import torch
 
 from torchtime.constants import OBJ_EXT
 from torchtime.data import UEA
-from torchtime.utils import _get_SHA256
+
+pytestmark = pytest.mark.xdist_group(name="uea_CharacterTrajectories")
 
 DATASET = "CharacterTrajectories"
 SEED = 456789
@@ -72,7 +73,7 @@ class TestUEACharacterTrajectories:
                 seed=SEED,
             )
 
-    def test_load_data(self):
+    def test_load_data(self, get_SHA256):
         """Validate data set."""
         UEA(
             dataset=DATASET,
@@ -82,15 +83,15 @@ class TestUEACharacterTrajectories:
         )
         if CHECKSUM_X:
             assert (
-                _get_SHA256(".torchtime/uea_" + DATASET + "/X" + OBJ_EXT) == CHECKSUM_X
+                get_SHA256(".torchtime/uea_" + DATASET + "/X" + OBJ_EXT) == CHECKSUM_X
             )
         if CHECKSUM_Y:
             assert (
-                _get_SHA256(".torchtime/uea_" + DATASET + "/y" + OBJ_EXT) == CHECKSUM_Y
+                get_SHA256(".torchtime/uea_" + DATASET + "/y" + OBJ_EXT) == CHECKSUM_Y
             )
         if CHECKSUM_LENGTH:
             assert (
-                _get_SHA256(".torchtime/uea_" + DATASET + "/length" + OBJ_EXT)
+                get_SHA256(".torchtime/uea_" + DATASET + "/length" + OBJ_EXT)
                 == CHECKSUM_LENGTH
             )
 
@@ -124,15 +125,8 @@ class TestUEACharacterTrajectories:
         ):
             dataset.length_test
 
-    def test_train_val_test(self):
+    def test_train_val_test(self, dataset):
         """Test training/validation/test split sizes."""
-        dataset = UEA(
-            dataset=DATASET,
-            split="train",
-            train_prop=0.7,
-            val_prop=0.2,
-            seed=SEED,
-        )
         # Check data set size
         assert dataset.X_train.shape == torch.Size([2002, 182, 4])
         assert dataset.y_train.shape == torch.Size([2002, 20])
@@ -144,19 +138,12 @@ class TestUEACharacterTrajectories:
         assert dataset.y_test.shape == torch.Size([285, 20])
         assert dataset.length_test.shape == torch.Size([285])
 
-    def test_train_split(self):
+    def test_train_split(self, dataset):
         """Test training split is returned."""
-        dataset = UEA(
-            dataset=DATASET,
-            split="train",
-            train_prop=0.7,
-            val_prop=0.2,
-            seed=SEED,
-        )
         # Check correct split is returned
-        assert torch.allclose(dataset.X, dataset.X_train, equal_nan=True)
-        assert torch.allclose(dataset.y, dataset.y_train, equal_nan=True)
-        assert torch.allclose(dataset.length, dataset.length_train, equal_nan=True)
+        assert dataset.X is dataset.X_train
+        assert dataset.y is dataset.y_train
+        assert dataset.length is dataset.length_train
 
     def test_val_split(self):
         """Test validation split is returned."""
@@ -168,9 +155,9 @@ class TestUEACharacterTrajectories:
             seed=SEED,
         )
         # Check correct split is returned
-        assert torch.allclose(dataset.X, dataset.X_val, equal_nan=True)
-        assert torch.allclose(dataset.y, dataset.y_val, equal_nan=True)
-        assert torch.allclose(dataset.length, dataset.length_val, equal_nan=True)
+        assert dataset.X is dataset.X_val
+        assert dataset.y is dataset.y_val
+        assert dataset.length is dataset.length_val
 
     def test_test_split(self):
         """Test test split is returned."""
@@ -182,9 +169,9 @@ class TestUEACharacterTrajectories:
             seed=SEED,
         )
         # Check correct split is returned
-        assert torch.allclose(dataset.X, dataset.X_test, equal_nan=True)
-        assert torch.allclose(dataset.y, dataset.y_test, equal_nan=True)
-        assert torch.allclose(dataset.length, dataset.length_test, equal_nan=True)
+        assert dataset.X is dataset.X_test
+        assert dataset.y is dataset.y_test
+        assert dataset.length is dataset.length_test
 
     def test_length(self):
         """Test length attribute."""
@@ -196,38 +183,27 @@ class TestUEACharacterTrajectories:
             time=False,
             seed=SEED,
         )
-        for i, Xi in enumerate(dataset.X_train.unbind()):
-            length_i = dataset.length_train[i]
-            assert not torch.all(torch.isnan(Xi[length_i - 1]))
-            assert torch.all(torch.isnan(Xi[length_i:]))
-        for i, Xi in enumerate(dataset.X_val.unbind()):
-            length_i = dataset.length_val[i]
-            assert not torch.all(torch.isnan(Xi[length_i - 1]))
-            assert torch.all(torch.isnan(Xi[length_i:]))
-        for i, Xi in enumerate(dataset.X_test.unbind()):
-            length_i = dataset.length_test[i]
-            assert not torch.all(torch.isnan(Xi[length_i - 1]))
-            assert torch.all(torch.isnan(Xi[length_i:]))
-
-    def test_missing(self):
+        for X, length in [
+            (dataset.X_train, dataset.length_train),
+            (dataset.X_val, dataset.length_val),
+            (dataset.X_test, dataset.length_test),
+        ]:
+            all_nan = torch.all(torch.isnan(X), dim=-1)  # shape (n, s)
+            padding = torch.arange(X.size(1)) >= length.unsqueeze(1)
+            assert not torch.any(all_nan[torch.arange(X.size(0)), length - 1])
+            assert torch.all(all_nan[padding])
+
+    def test_missing(self, dataset_missing):
         """Test missing data simulation."""
-        dataset = UEA(
-            dataset=DATASET,
-            split="train",
-            train_prop=0.7,
-            val_prop=0.2,
-            missing=0.5,
-            seed=SEED,
-        )
         # Check number of NaNs
         assert (
-            torch.sum(torch.isnan(dataset.X_train)).item() == 732969
+            torch.sum(torch.isnan(dataset_missing.X_train)).item() == 732969
         )  # expect around 3 * (239873 * 0.5 + 2002 * 182 - 239873) = 733,283
         assert (
-            torch.sum(torch.isnan(dataset.X_val)).item() == 208686
+            torch.sum(torch.isnan(dataset_missing.X_val)).item() == 208686
         )  # expect around 3 * (68797 * 0.5 + 571 * 182 - 68797) = 208,571
         assert (
-            torch.sum(torch.isnan(dataset.X_test)).item() == 103872
+            torch.sum(torch.isnan(dataset_missing.X_test)).item() == 103872
         )  # expect around 3 * (34269 * 0.5 + 285 * 182 - 34269) = 104,207
 
     def test_invalid_impute(self):
@@ -261,72 +237,26 @@ class TestUEACharacterTrajectories:
                 seed=SEED,
             )
 
-    def test_no_impute(self):
+    def test_no_impute(self, dataset_missing):
         """Test no imputation."""
-        dataset = UEA(
-            dataset=DATASET,
-            split="train",
-            train_prop=0.7,
-            val_prop=0.2,
-            missing=0.5,
-            impute="none",
-            seed=SEED,
-        )
         # Check number of NaNs
-        assert torch.sum(torch.isnan(dataset.X_train)).item() == 732969
-        assert torch.sum(torch.isnan(dataset.y_train)).item() == 0
-        assert torch.sum(torch.isnan(dataset.X_val)).item() == 208686
-        assert torch.sum(torch.isnan(dataset.y_val)).item() == 0
-        assert torch.sum(torch.isnan(dataset.X_test)).item() == 103872
-        assert torch.sum(torch.isnan(dataset.y_test)).item() == 0
-
-    def test_zero_impute(self):
-        """Test zero imputation."""
-        dataset = UEA(
-            dataset=DATASET,
-            split="train",
-            train_prop=0.7,
-            val_prop=0.2,
-            missing=0.5,
-            impute="zero",
-            seed=SEED,
-        )
-        # Check no NaNs post imputation
-        assert torch.sum(torch.isnan(dataset.X_train)).item() == 0
-        assert torch.sum(torch.isnan(dataset.y_train)).item() == 0
-        assert torch.sum(torch.isnan(dataset.X_val)).item() == 0
-        assert torch.sum(torch.isnan(dataset.y_val)).item() == 0
-        assert torch.sum(torch.isnan(dataset.X_test)).item() == 0
-        assert torch.sum(torch.isnan(dataset.y_test)).item() == 0
-
-    def test_mean_impute(self):
-        """Test mean imputation."""
-        dataset = UEA(
-            dataset=DATASET,
-            split="train",
-            train_prop=0.7,
-            val_prop=0.2,
-            missing=0.5,
-            impute="mean",
-            seed=SEED,
-        )
-        # Check no NaNs post imputation
-        assert torch.sum(torch.isnan(dataset.X_train)).item() == 0
-        assert torch.sum(torch.isnan(dataset.y_train)).item() == 0
-        assert torch.sum(torch.isnan(dataset.X_val)).item() == 0
-        assert torch.sum(torch.isnan(dataset.y_val)).item() == 0
-        assert torch.sum(torch.isnan(dataset.X_test)).item() == 0
-        assert torch.sum(torch.isnan(dataset.y_test)).item() == 0
-
-    def test_forward_impute(self):
-        """Test forward imputation."""
+        assert torch.sum(torch.isnan(dataset_missing.X_train)).item() == 732969
+        assert torch.sum(torch.isnan(dataset_missing.y_train)).item() == 0
+        assert torch.sum(torch.isnan(dataset_missing.X_val)).item() == 208686
+        assert torch.sum(torch.isnan(dataset_missing.y_val)).item() == 0
+        assert torch.sum(torch.isnan(dataset_missing.X_test)).item() == 103872
+        assert torch.sum(torch.isnan(dataset_missing.y_test)).item() == 0
+
+    @pytest.mark.parametrize("impute", ["zero", "mean", "forward"])
+    def test_impute(self, impute):
+        """Test zero, mean and forward imputation."""
         dataset = UEA(
             dataset=DATASET,
             split="train",
             train_prop=0.7,
             val_prop=0.2,
             missing=0.5,
-            impute="forward",
+            impute=impute,
             seed=SEED,
         )
         # Check no NaNs post imputation
@@ -337,12 +267,8 @@ class TestUEACharacterTrajectories:
         assert torch.sum(torch.isnan(dataset.X_test)).item() == 0
         assert torch.sum(torch.isnan(dataset.y_test)).item() == 0
 
-    def test_custom_imputation_1(self):
+    def test_custom_imputation_1(self, impute_with_zero):
         """Test custom imputation function."""
-
-        def impute_with_zero(X, y, fill, select):
-            return X.nan_to_num(0), y.nan_to_num(0)
-
         dataset = UEA(
             dataset=DATASET,
             split="train",
@@ -360,12 +286,8 @@ class TestUEACharacterTrajectories:
         assert torch.sum(torch.isnan(dataset.X_test)).item() == 0
         assert torch.sum(torch.isnan(dataset.y_test)).item() == 0
 
-    def test_custom_imputation_2(self):
+    def test_custom_imputation_2(self, no_imputation):
         """Test custom imputation function."""
-
-        def no_imputation(X, y, fill, select):
-            return X, y
-
         dataset = UEA(
             dataset=DATASET,
             split="train",
@@ -383,7 +305,7 @@ class TestUEACharacterTrajectories:
         assert torch.sum(torch.isnan(dataset.X_test)).item() == 103872
         assert torch.sum(torch.isnan(dataset.y_test)).item() == 0
 
-    def test_overwrite_data(self):
+    def test_overwrite_data(self, get_SHA256):
         """Overwrite cache and validate data set."""
         UEA(
             dataset=DATASET,
@@ -394,46 +316,28 @@ class TestUEACharacterTrajectories:
         )
         if CHECKSUM_X:
             assert (
-                _get_SHA256(".torchtime/uea_" + DATASET + "/X" + OBJ_EXT) == CHECKSUM_X
+                get_SHA256(".torchtime/uea_" + DATASET + "/X" + OBJ_EXT) == CHECKSUM_X
             )
         if CHECKSUM_Y:
             assert (
-                _get_SHA256(".torchtime/uea_" + DATASET + "/y" + OBJ_EXT) == CHECKSUM_Y
+                get_SHA256(".torchtime/uea_" + DATASET + "/y" + OBJ_EXT) == CHECKSUM_Y
             )
         if CHECKSUM_LENGTH:
             assert (
-                _get_SHA256(".torchtime/uea_" + DATASET + "/length" + OBJ_EXT)
+                get_SHA256(".torchtime/uea_" + DATASET + "/length" + OBJ_EXT)
                 == CHECKSUM_LENGTH
             )
 
-    def test_time(self):
+    def test_time(self, dataset):
         """Test time argument."""
-        dataset = UEA(
-            dataset=DATASET,
-            split="train",
-            train_prop=0.7,
-            val_prop=0.2,
-            time=True,
-            seed=SEED,
-        )
         # Check data set size
         assert dataset.X_train.shape == torch.Size([2002, 182, 4])
         assert dataset.X_val.shape == torch.Size([571, 182, 4])
         assert dataset.X_test.shape == torch.Size([285, 182, 4])
         # Check time channel
-        for i in range(182):
-            assert torch.equal(
-                dataset.X_train[:, i, 0],
-                torch.full([2002], fill_value=i, dtype=torch.float),
-            )
-            assert torch.equal(
-                dataset.X_val[:, i, 0],
-                torch.full([571], fill_value=i, dtype=torch.float),
-            )
-            assert torch.equal(
-                dataset.X_test[:, i, 0],
-                torch.full([285], fill_value=i, dtype=torch.float),
-            )
+        time_stamp = torch.arange(182, dtype=torch.float)
+        for X in [dataset.X_train, dataset.X_val, dataset.X_test]:
+            assert torch.equal(X[:, :, 0], time_stamp.expand(X.size(0), -1))
 
     def test_no_time(self):
         """Test time argument."""
@@ -512,19 +416,9 @@ class TestUEACharacterTrajectories:
         assert dataset.X_val.shape == torch.Size([571, 182, 10])
         assert dataset.X_test.shape == torch.Size([285, 182, 10])
         # Check time channel
-        for i in range(182):
-            assert torch.equal(
-                dataset.X_train[:, i, 0],
-                torch.full([2002], fill_value=i, dtype=torch.float),
-            )
-            assert torch.equal(
-                dataset.X_val[:, i, 0],
-                torch.full([571], fill_value=i, dtype=torch.float),
-            )
-            assert torch.equal(
-                dataset.X_test[:, i, 0],
-                torch.full([285], fill_value=i, dtype=torch.float),
-            )
+        time_stamp = torch.arange(182, dtype=torch.float)
+        for X in [dataset.X_train, dataset.X_val, dataset.X_test]:
+            assert torch.equal(X[:, :, 0], time_stamp.expand(X.size(0), -1))
         # Check mask channel
         assert torch.sum(dataset.X_train[:, :, 4]) == torch.sum(dataset.length_train)
         assert torch.sum(dataset.X_val[:, :, 4]) == torch.sum(dataset.length_val)
@@ -550,36 +444,23 @@ class TestUEACharacterTrajectories:
             standardise=True,
             seed=SEED,
         )
-        for c, Xc in enumerate(dataset.X_train.unbind(dim=-1)):
-            assert torch.allclose(
-                torch.nanmean(Xc), torch.Tensor([0.0]), rtol=RTOL, atol=ATOL
-            )
-            assert torch.allclose(
-                torch.std(Xc[~torch.isnan(Xc)]),
-                torch.Tensor([1.0]),
-                rtol=RTOL,
-                atol=ATOL,
-            )
+        X = dataset.X_train
+        observed = ~torch.isnan(X)
+        means = torch.nanmean(X, dim=(0, 1))
+        stds = torch.sqrt(
+            torch.nansum((X - means) ** 2, dim=(0, 1)) / (observed.sum(dim=(0, 1)) - 1)
+        )
+        assert torch.allclose(means, torch.zeros_like(means), rtol=RTOL, atol=ATOL)
+        assert torch.allclose(stds, torch.ones_like(stds), rtol=RTOL, atol=ATOL)
 
-    def test_reproducibility_1(self):
+    def test_reproducibility_1(self, dataset):
         """Test seed argument."""
-        dataset = UEA(
-            dataset=DATASET,
-            split="train",
-            train_prop=0.7,
-            val_prop=0.2,
-            seed=SEED,
-        )
         # Check first value in each data set
-        assert torch.allclose(
-            dataset.X_train[0, 0, 1], torch.tensor(-0.1869), rtol=RTOL, atol=ATOL
-        )
-        assert torch.allclose(
-            dataset.X_val[0, 0, 1], torch.tensor(0.0418), rtol=RTOL, atol=ATOL
-        )
-        assert torch.allclose(
-            dataset.X_test[0, 0, 1], torch.tensor(0.0940), rtol=RTOL, atol=ATOL
+        actual = torch.stack(
+            [dataset.X_train[0, 0, 1], dataset.X_val[0, 0, 1], dataset.X_test[0, 0, 1]]
         )
+        expected = torch.tensor([-0.1869, 0.0418, 0.0940])
+        assert torch.allclose(actual, expected, rtol=RTOL, atol=ATOL)
 
     def test_reproducibility_2(self):
         """Test seed argument."""
@@ -591,12 +472,8 @@ class TestUEACharacterTrajectories:
             seed=999999,
         )
         # Check first value in each data set
-        assert torch.allclose(
-            dataset.X_train[0, 0, 1], torch.tensor(0.0391), rtol=RTOL, atol=ATOL
-        )
-        assert torch.allclose(
-            dataset.X_val[0, 0, 1], torch.tensor(0.0), rtol=RTOL, atol=ATOL
-        )
-        assert torch.allclose(
-            dataset.X_test[0, 0, 1], torch.tensor(-0.0767), rtol=RTOL, atol=ATOL
+        actual = torch.stack(
+            [dataset.X_train[0, 0, 1], dataset.X_val[0, 0, 1], dataset.X_test[0, 0, 1]]
         )
+        expected = torch.tensor([0.0391, 0.0, -0.0767])
+        assert torch.allclose(actual, expected, rtol=RTOL, atol=ATOL)
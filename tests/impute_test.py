@@ -6,6 +6,8 @@ import torch
 from torchtime.data import UEA
 from torchtime.impute import forward_impute, replace_missing
 
+pytestmark = pytest.mark.xdist_group(name="uea_CharacterTrajectories")
+
 SEED = 456789
 RTOL = 1e-4
 ATOL = 1e-4
@@ -3,8 +3,17 @@ import os
 import pytest
 import torch
 
-from torchtime.constants import CHECKSUM_EXT, OBJ_EXT
-from torchtime.utils import _check_SHA256, _get_SHA256
+from torchtime.constants import CACHE_MANIFEST, CHECKSUM_EXT, OBJ_EXT
+from torchtime.utils import (
+    _cache_channels,
+    _cache_exists,
+    _channels_cache_name,
+    _check_SHA256,
+    _clear_channels_cache,
+    _get_SHA256,
+    _nanmode,
+    _validate_cache,
+)
 
 SEED = 456789
 N = 10000
@@ -48,3 +57,35 @@ class TestUtils:
         X_path, sha_path, error_path, _, _ = checksum_files
         assert _check_SHA256(X_path, sha_path)
         assert not _check_SHA256(X_path, error_path)
+
+    def test_cache_channels(self, tmp_path):
+        """Test caching/clearing ``X`` with added channels."""
+        X = torch.rand((2, 3, 4), generator=torch.Generator().manual_seed(SEED))
+        options = {"time": True, "mask": True, "delta": False}
+        obj = _channels_cache_name(options)
+        assert obj == _channels_cache_name(dict(reversed(options.items())))
+        assert obj != _channels_cache_name({**options, "mask": False})
+        _cache_channels(tmp_path, obj, X, options)
+        assert _cache_exists(tmp_path, [obj])
+        assert _validate_cache(tmp_path, [obj])
+        assert torch.equal(torch.load(tmp_path / (obj + OBJ_EXT)), X)
+        _clear_channels_cache(tmp_path)
+        assert not _cache_exists(tmp_path, [obj])
+        assert not (tmp_path / CACHE_MANIFEST).is_file()
+
+    def test_nanmode(self):
+        """Test _nanmode() function."""
+        X = torch.randint(
+            0, 5, (20, 30, C), generator=torch.Generator().manual_seed(SEED)
+        )
+        X = X.float()
+        X[X == 4] = float("nan")
+        X[:, :, -1] = float("nan")
+        modes = _nanmode(X)
+        for channel in range(C - 1):
+            channel_X = X[:, :, channel]
+            assert modes[channel] == torch.mode(channel_X[~torch.isnan(channel_X)])[0]
+        assert torch.isnan(modes[-1])
+        # Smallest value if multiple modes
+        X_tie = torch.tensor([[2.0, 3.0], [1.0, float("nan")], [2.0, 3.0], [1.0, 0.0]])
+        assert torch.equal(_nanmode(X_tie), torch.tensor([1.0, 3.0]))